@@ -0,0 +1,247 @@
+import os
+import time
+import pygame
+from concurrent.futures import ThreadPoolExecutor
+from atlas import Atlas
+
+# -- Asset Paths --
+ASSETS_FOLDER = "Assets"
+GAME_ASSETS_FOLDER = os.path.join(ASSETS_FOLDER, "PixelSpaceRage", "256px")
+
+# -- Constants --
+LOADER_WORKERS = min(4, os.cpu_count() or 1)  # Threads decoding images in the background
+
+# -- Background Loading --
+def decode_image(path):
+    """Read and decode an image file (safe off the main thread, no convert).
+
+    Returns the Surface and the seconds spent decoding it.
+    """
+    start = time.perf_counter()
+    image = pygame.image.load(path)
+    return image, time.perf_counter() - start
+
+class LoadJob:
+    """Images being decoded on a thread pool for an AssetManager.
+
+    Workers only read and decode files; poll() runs on the main thread
+    and hands finished images to the manager, which does convert_alpha
+    there. An image requested before its turn is waited for directly.
+    """
+
+    def __init__(self, manager, paths, workers=LOADER_WORKERS):
+        self.manager = manager
+        self.total = len(paths)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.futures = {path: self.executor.submit(decode_image, path) for path in paths}
+        manager.pending.update(self.futures)
+
+    def poll(self):
+        """Collect decoded images; returns progress from 0.0 to 1.0"""
+        for path, future in list(self.futures.items()):
+            if future.done():
+                self.manager.collect(path)
+        progress = self.get_progress()
+        if progress >= 1.0:
+            self.executor.shutdown(wait=False)
+        return progress
+
+    def get_progress(self):
+        unfinished = sum(1 for path in self.futures if path in self.manager.pending)
+        return 1.0 if self.total == 0 else (self.total - unfinished) / self.total
+
+    def is_done(self):
+        return self.get_progress() >= 1.0
+
+    def finish(self):
+        """Block until every image is collected"""
+        for path in self.futures:
+            self.manager.collect(path)
+        self.executor.shutdown()
+
+# -- Asset Manager --
+class AssetManager:
+    """Process-wide registry that loads and scales every asset exactly once.
+
+    Images are cached both as decoded sources (keyed by path) and as
+    scaled copies (keyed by path and size), so every screen and every
+    restart shares the same Surfaces. With a cooked AssetPack set, images
+    are taken from it first and only missing or stale ones are decoded
+    from PNG. Load and scale times are recorded per asset for get_report().
+    """
+
+    def __init__(self):
+        self.sources = {}  # path -> decoded Surface
+        self.pending = {}  # path -> Future of a background decode
+        self.images = {}  # (path, size) -> scaled Surface
+        self.sounds = {}  # path -> Sound
+        self.music_path = None  # Music currently loaded into the mixer
+        self.load_times = {}  # asset name -> seconds spent loading/scaling
+        self.disk_loads = 0  # Files read from disk so far
+        self.pack = None  # Cooked asset pack (asset_pack.AssetPack) or None
+        self.pack_loads = 0  # Images served from the pack
+
+    def record_time(self, name, start):
+        self.load_times[name] = self.load_times.get(name, 0.0) + time.perf_counter() - start
+
+    def set_pack(self, pack):
+        """Serve images from a cooked asset pack (None to load PNGs only)"""
+        if self.pack is not None:
+            self.pack.close()
+        self.pack = pack
+        if pack is not None:
+            self.disk_loads += 1
+
+    def load_packed(self, path, size):
+        """Return (path, size) from the asset pack, or None if it is not packed"""
+        if self.pack is None:
+            return None
+        start = time.perf_counter()
+        image = self.pack.get_image(path, size)
+        if image is not None:
+            self.pack_loads += 1
+            self.record_time(get_asset_name(path, size) + " (pack)", start)
+        return image
+
+    def preload(self, paths, workers=LOADER_WORKERS):
+        """Start decoding image files in the background; returns a LoadJob.
+
+        Paths the asset pack already covers are skipped.
+        """
+        paths = [path for path in paths if path not in self.sources and path not in self.pending
+                 and not (self.pack is not None and self.pack.has_source(path))]
+        return LoadJob(self, paths, workers)
+
+    def collect(self, path):
+        """Convert a background-decoded image on the main thread, waiting if needed"""
+        future = self.pending.pop(path, None)
+        if future is None:
+            return
+        try:
+            image, decode_seconds = future.result()
+        except (pygame.error, FileNotFoundError):
+            return  # get_source will retry and raise as usual
+        start = time.perf_counter()
+        self.sources[path] = image.convert_alpha()
+        self.disk_loads += 1
+        self.record_time(path, start)
+        self.load_times[path] += decode_seconds
+
+    def get_source(self, path):
+        """Decode an image file once (convert_alpha needs a display)"""
+        if path in self.pending:
+            self.collect(path)
+        source = self.sources.get(path)
+        if source is None:
+            source = self.load_packed(path, None)
+            if source is not None:
+                self.sources[path] = source
+                return source
+            start = time.perf_counter()
+            source = pygame.image.load(path).convert_alpha()
+            self.disk_loads += 1
+            self.sources[path] = source
+            self.record_time(path, start)
+        return source
+
+    def image(self, path, size=None, fallback_color=None):
+        """Return the image at path scaled to size, loading it on first use.
+
+        If fallback_color is given, a missing or broken file yields a
+        plain Surface of that colour instead of raising.
+        """
+        key = (path, size)
+        image = self.images.get(key)
+        if image is not None:
+            return image
+
+        if size is not None:
+            image = self.load_packed(path, size)
+            if image is not None:
+                self.images[key] = image
+                return image
+
+        try:
+            image = self.get_source(path)
+        except (pygame.error, FileNotFoundError):
+            if fallback_color is None:
+                raise
+            image = pygame.Surface(size or (1, 1))
+            image.fill(fallback_color)
+        else:
+            if size is not None and image.get_size() != size:
+                start = time.perf_counter()
+                image = pygame.transform.scale(image, size)
+                self.record_time(get_asset_name(path, size), start)
+        self.images[key] = image
+        return image
+
+    def build_atlas(self, keys):
+        """Pack the images for (path, size) keys into one Atlas and serve them from it.
+
+        Afterwards image(path, size) returns the atlas subsurface, so the
+        separate scaled copies can be freed. Keys that fail to load are left out.
+        """
+        frames = {}
+        for path, size in keys:
+            try:
+                frames[(path, size)] = self.image(path, size)
+            except (pygame.error, FileNotFoundError):
+                continue
+        start = time.perf_counter()
+        atlas = Atlas(frames)
+        self.images.update(atlas.frames)
+        self.record_time(f"atlas ({len(atlas)} frames)", start)
+        return atlas
+
+    def sound(self, path):
+        """Return the Sound at path, or None if it cannot be loaded"""
+        if path not in self.sounds:
+            start = time.perf_counter()
+            try:
+                self.sounds[path] = pygame.mixer.Sound(path)
+                self.disk_loads += 1
+            except pygame.error:
+                self.sounds[path] = None
+            self.record_time(path, start)
+        return self.sounds[path]
+
+    def load_music(self, path):
+        """Load background music into the mixer unless it is already loaded"""
+        if self.music_path != path:
+            start = time.perf_counter()
+            pygame.mixer.music.load(path)
+            self.disk_loads += 1
+            self.music_path = path
+            self.record_time(path, start)
+
+    def clear(self):
+        """Forget every cached asset (e.g. to measure a cold start again)"""
+        self.sources.clear()
+        self.pending.clear()
+        self.images.clear()
+        self.sounds.clear()
+        self.music_path = None
+        self.load_times.clear()
+        self.disk_loads = 0
+        self.pack_loads = 0
+
+    def get_report(self):
+        """List (asset name, milliseconds) pairs, slowest first"""
+        report = [(name, seconds * 1000) for name, seconds in self.load_times.items()]
+        return sorted(report, key=lambda item: item[1], reverse=True)
+
+    def print_report(self):
+        """Print load time per asset and the total"""
+        report = self.get_report()
+        for name, ms in report:
+            print(f"{ms:8.2f} ms  {name}")
+        print(f"{sum(ms for _, ms in report):8.2f} ms  total ({self.disk_loads} files read, "
+              f"{self.pack_loads} images from the asset pack)")
+
+def get_asset_name(path, size):
+    """Report name of an image scaled to size"""
+    return path if size is None else f"{path} @{size[0]}x{size[1]}"
+
+# Shared instance used by every screen
+asset_manager = AssetManager()
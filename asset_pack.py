@@ -0,0 +1,165 @@
+"""Cooked asset pack: images pre-scaled once and stored as raw RGBA.
+
+Cook the pack after changing any image:
+    python asset_pack.py
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import pygame
+from asset_manager import ASSETS_FOLDER
+
+# -- Constants --
+PACK_PATH = os.path.join(ASSETS_FOLDER, "cooked_assets.pack")
+PACK_MAGIC = b"SSPACK01"
+HEADER = struct.Struct("<8sI")  # magic, index length in bytes
+DATA_ALIGN = 16  # Pixel data of every entry starts on this boundary
+
+# -- Source Validation --
+def hash_file(path):
+    """sha1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def describe_source(path):
+    """Fingerprint of a source file as stored in the pack index"""
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': hash_file(path)}
+
+def is_source_valid(path, recorded):
+    """True if the source file still matches its recorded fingerprint.
+
+    A matching mtime and size is trusted as is; otherwise (e.g. after a
+    fresh checkout touched the file) the contents are hashed and compared.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size != recorded['size']:
+        return False
+    if stat.st_mtime_ns == recorded['mtime_ns']:
+        return True
+    return hash_file(path) == recorded['sha1']
+
+def get_entry_key(path, size):
+    """Index key of an image; size None means the unscaled source"""
+    return path if size is None else f"{path}@{size[0]}x{size[1]}"
+
+# -- Cooking --
+def cook(manager, pack_path=PACK_PATH, source_paths=()):
+    """Write every scaled image loaded by manager into a pack file.
+
+    Images whose requested size varies between launches (source_paths)
+    are stored unscaled instead, so they still skip the PNG decode.
+    Returns the number of entries written.
+    """
+    images = {}
+    for (path, size), image in manager.images.items():
+        if path in manager.sources and size is not None:  # Skip fallback surfaces
+            images[get_entry_key(path, size)] = (path, image)
+    for path in source_paths:
+        images[get_entry_key(path, None)] = (path, manager.get_source(path))
+
+    entries = {}
+    sources = {}
+    blobs = []
+    offset = 0
+    for key, (path, image) in images.items():
+        data = pygame.image.tobytes(image, 'RGBA')
+        entries[key] = {'source': path, 'size': list(image.get_size()), 'offset': offset, 'length': len(data)}
+        if path not in sources:
+            sources[path] = describe_source(path)
+        padding = -len(data) % DATA_ALIGN
+        blobs.append(data + b'\0' * padding)
+        offset += len(data) + padding
+
+    index = json.dumps({'sources': sources, 'entries': entries}).encode('utf-8')
+    index += b' ' * (-(HEADER.size + len(index)) % DATA_ALIGN)
+    temp_path = pack_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(PACK_MAGIC, len(index)))
+        file.write(index)
+        for blob in blobs:
+            file.write(blob)
+    os.replace(temp_path, pack_path)  # Never leave a half-written pack behind
+    return len(entries)
+
+# -- Loading --
+class AssetPack:
+    """Read-only view of a cooked pack file, memory-mapped.
+
+    get_image() wraps the mapped bytes with pygame.image.frombuffer and
+    converts the result for the display, so nothing is decoded. Entries
+    whose source PNG changed since cooking are treated as missing and
+    the caller falls back to loading the PNG.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = HEADER.unpack_from(self.map, 0)
+        if magic != PACK_MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not a cooked asset pack")
+        index = json.loads(self.map[HEADER.size:HEADER.size + index_length])
+        self.data_start = HEADER.size + index_length
+        self.entries = index['entries']
+        self.valid_sources = {path for path, recorded in index['sources'].items()
+                              if is_source_valid(path, recorded)}
+        self.stale = len(index['sources']) - len(self.valid_sources)  # Sources changed since cooking
+
+    def has_source(self, path):
+        """True if the pack holds valid images cooked from path"""
+        return path in self.valid_sources
+
+    def get_image(self, path, size=None):
+        """Return the cooked image for (path, size), or None if not packed or stale"""
+        entry = self.entries.get(get_entry_key(path, size))
+        if entry is None or entry['source'] not in self.valid_sources:
+            return None
+        start = self.data_start + entry['offset']
+        data = memoryview(self.map)[start:start + entry['length']]
+        mapped = pygame.image.frombuffer(data, tuple(entry['size']), 'RGBA')
+        image = mapped.convert_alpha()  # Copy into the display format
+        del mapped
+        data.release()
+        return image
+
+    def close(self):
+        self.map.close()
+
+def load_pack(path=PACK_PATH):
+    """Open the pack at path, or return None if it is missing or unreadable"""
+    try:
+        return AssetPack(path)
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+# -- Command Line --
+def main():
+    """Load every image the game uses headless and cook them into PACK_PATH"""
+    import random
+    import core
+    import game
+    import headless
+    import menu
+    from asset_manager import asset_manager
+
+    headless.init_headless()
+    assets = game.load_assets(random.Random(0))
+    for ship_index, ship_name in enumerate(game.SHIP_NAMES):
+        core.get_ship_variants(game.GAME_ASSETS_FOLDER, ship_name, menu.SHIP_PREVIEW_SIZE)  # Menu preview
+        headless.create_session(assets, seed=0, selected_ship=ship_index)  # Ship, powerups, HUD icon
+    count = cook(asset_manager, PACK_PATH, source_paths=game.get_meteor_paths())
+    print(f"Cooked {count} images into {PACK_PATH} ({os.path.getsize(PACK_PATH) / 1024:.0f} KB)")
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
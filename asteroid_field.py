@@ -0,0 +1,261 @@
+import pygame
+from itertools import starmap
+import collision
+from rotation_cache import rotation_cache
+
+try:
+    import numpy as np
+except ImportError:  # The field is optional; Block sprites are used without NumPy
+    np = None
+
+# -- Constants --
+HEIGHT = 700
+WIDTH = 1000
+ROTATE_INTERVAL = 50  # ms between rotation steps, as in Block.rotate
+INITIAL_CAPACITY = 64
+
+# Per-asteroid columns and their dtypes
+FIELDS = {
+    'x': 'int64', 'y': 'int64',  # rect topleft
+    'w': 'int64', 'h': 'int64',  # rect size of the current rotated frame
+    'speed_x': 'int64', 'speed_y': 'int64',
+    'rotation': 'int64', 'rotation_speed': 'int64',
+    'image_index': 'int64',
+    'last_update': 'float64'  # Clock ticks of the last rotation step
+}
+
+def is_available():
+    """True if NumPy is installed"""
+    return np is not None
+
+# -- Asteroid Field --
+class AsteroidField:
+    """All asteroids stored as NumPy columns instead of Block sprites.
+
+    update() rotates, moves and culls every asteroid with a few array
+    operations per frame. It draws from rng in the same order as Block,
+    so a field and the same number of Blocks built with equally seeded
+    rngs stay identical (see check_parity). Asteroids keep their spawn
+    order, which is the order pygame's collide functions would use.
+    """
+
+    def __init__(self, image_list, clock=pygame.time, rng=None):
+        if np is None:
+            raise ImportError("AsteroidField needs NumPy")
+        self.images = list(image_list)
+        self.clock = clock
+        self.rng = rng
+        self.count = 0
+        self.columns = {name: np.zeros(INITIAL_CAPACITY, dtype) for name, dtype in FIELDS.items()}
+
+        # Rotated frame and its size for every image and whole-degree angle
+        self.frames = [[rotation_cache.get_frame(image, angle) for angle in range(360)] for image in self.images]
+        self.frame_widths = np.array([[frame.get_width() for frame in frames] for frames in self.frames])
+        self.frame_heights = np.array([[frame.get_height() for frame in frames] for frames in self.frames])
+        self.frame_table = np.empty(len(self.images) * 360, object)  # Flat lookup by image_index * 360 + angle
+        self.frame_table[:] = [frame for frames in self.frames for frame in frames]
+        # Collision mask and tight radius in the same layout
+        masks = [rotation_cache.get_mask(image, angle) for image in self.images for angle in range(360)]
+        self.mask_table = np.empty(len(masks), object)
+        self.mask_table[:] = [mask for mask, _ in masks]
+        self.radius_table = np.array([radius for _, radius in masks], np.int64)
+
+    def __len__(self):
+        return self.count
+
+    def __getattr__(self, name):
+        # Live views of the columns, e.g. field.x
+        columns = self.__dict__.get('columns')
+        if columns is not None and name in columns:
+            return columns[name][:self.count]
+        raise AttributeError(name)
+
+    # -- Spawning --
+    def spawn(self):
+        """Add one asteroid, drawing from rng exactly like Block.__init__"""
+        rng = self.rng
+        if self.count == len(self.columns['x']):
+            for name, column in self.columns.items():
+                self.columns[name] = np.concatenate([column, np.zeros_like(column)])
+        image = rng.choice(self.images)
+        image_index = self.images.index(image)
+        width, height = image.get_size()
+        values = {
+            'x': rng.randrange(WIDTH - width),
+            'y': rng.randrange(-100, -40),
+            'w': width,
+            'h': height,
+            'speed_y': rng.randrange(2, 6),
+            'speed_x': rng.randrange(-2, 2),
+            'rotation': 0,
+            'rotation_speed': rng.randint(-5, 5),
+            'image_index': image_index,
+            'last_update': self.clock.get_ticks()
+        }
+        for name, value in values.items():
+            self.columns[name][self.count] = value
+        self.count += 1
+
+    def kill(self, indices):
+        """Remove asteroids by index, keeping the others in order"""
+        keep = np.ones(self.count, bool)
+        keep[indices] = False
+        kept = int(keep.sum())
+        for column in self.columns.values():
+            column[:kept] = column[:self.count][keep]
+        self.count = kept
+
+    def kill_all(self):
+        self.count = 0
+
+    # -- Simulation --
+    def update(self, now=None):
+        """Rotate, move and respawn every asteroid (Block.update for all)"""
+        if not self.count:
+            return
+        x, y, w, h = self.x, self.y, self.w, self.h
+
+        if now is None:
+            now = self.clock.get_ticks()
+        rotating = np.flatnonzero(now - self.last_update > ROTATE_INTERVAL)
+        if len(rotating):
+            self.last_update[rotating] = now
+            rotation = (self.rotation[rotating] + self.rotation_speed[rotating]) % 360
+            self.rotation[rotating] = rotation
+            image_index = self.image_index[rotating]
+            new_w = self.frame_widths[image_index, rotation]
+            new_h = self.frame_heights[image_index, rotation]
+            # Keep the rect centre where it was, like get_rect(center=old_center)
+            x[rotating] += w[rotating] // 2 - new_w // 2
+            y[rotating] += h[rotating] // 2 - new_h // 2
+            w[rotating] = new_w
+            h[rotating] = new_h
+
+        y += self.speed_y
+        x += self.speed_x
+        off_screen = np.flatnonzero((y > HEIGHT + 10) | (x < -25) | (x + w > WIDTH + 20))
+        # Respawns are rare, so they draw from rng one by one in Block's order
+        rng = self.rng
+        for i in off_screen.tolist():
+            x[i] = rng.randrange(WIDTH - int(w[i]))
+            y[i] = rng.randrange(-100, -40)
+            self.speed_y[i] = rng.randrange(1, 8)
+            self.speed_x[i] = rng.randrange(-2, 2)
+
+    # -- Queries --
+    def get_center(self, index):
+        """rect.center of one asteroid"""
+        return (int(self.x[index] + self.w[index] // 2), int(self.y[index] + self.h[index] // 2))
+
+    def get_centers(self):
+        return list(zip((self.x + self.w // 2).tolist(), (self.y + self.h // 2).tolist()))
+
+    def get_rects(self):
+        return list(starmap(pygame.Rect, zip(self.x.tolist(), self.y.tolist(), self.w.tolist(), self.h.tolist())))
+
+    def get_draw_commands(self, lag=0.0, viewport=None):
+        """(surface, rect) commands for every asteroid, in spawn order.
+
+        lag (a fraction of a step) draws every asteroid that far back
+        along its velocity, for interpolated rendering. With a viewport
+        rect, asteroids entirely outside it are left out.
+        """
+        x, y, w, h = self.x, self.y, self.w, self.h
+        if lag:
+            x = x - np.rint(self.speed_x * lag).astype(np.int64)
+            y = y - np.rint(self.speed_y * lag).astype(np.int64)
+        frame_index = self.image_index * 360 + self.rotation
+        if viewport is not None:
+            visible = ((x < viewport.right) & (x + w > viewport.left) &
+                       (y < viewport.bottom) & (y + h > viewport.top))
+            x, y, w, h, frame_index = x[visible], y[visible], w[visible], h[visible], frame_index[visible]
+        surfaces = self.frame_table[frame_index].tolist()
+        rects = starmap(pygame.Rect, zip(x.tolist(), y.tolist(), w.tolist(), h.tolist()))
+        return list(zip(surfaces, rects))
+
+    # -- Collisions --
+    def collide_group(self, group):
+        """groupcollide(asteroids, group, True, True, collide_rect_mask) against the field.
+
+        Asteroids are visited in spawn order and each sprite can only be
+        used up by the first asteroid it hits, as in pygame. Rect overlaps
+        are found for all pairs at once, then only those are pixel tested.
+        Returns the centres of the asteroids that were hit.
+        """
+        sprites = group.sprites()
+        if not self.count or not sprites:
+            return []
+        rects = np.array([tuple(sprite.rect) for sprite in sprites]).reshape(-1, 4)
+        left, top = rects[:, 0], rects[:, 1]
+        right, bottom = left + rects[:, 2], top + rects[:, 3]
+        x, y = self.x[:, None], self.y[:, None]
+        overlap = ((x < right) & (x + self.w[:, None] > left) &
+                   (y < bottom) & (y + self.h[:, None] > top) &
+                   (rects[:, 2] > 0) & (rects[:, 3] > 0))
+
+        hit_indices = []
+        used = np.zeros(len(sprites), bool)
+        for index in np.flatnonzero(overlap.any(axis=1)).tolist():
+            candidates = np.flatnonzero(overlap[index] & ~used).tolist()
+            hits = [i for i in candidates if self.collide_mask(index, sprites[i])]
+            if hits:
+                used[hits] = True
+                hit_indices.append(index)
+        for sprite_index in np.flatnonzero(used).tolist():
+            sprites[sprite_index].kill()
+        return self.pop(hit_indices)
+
+    def collide_circle(self, sprite):
+        """spritecollide(sprite, asteroids, True, collide_circle_mask) against the field.
+
+        Returns the centres of the asteroids that were hit.
+        """
+        if not self.count:
+            return []
+        center_x, center_y = sprite.rect.center
+        dx = self.x + self.w // 2 - center_x
+        dy = self.y + self.h // 2 - center_y
+        reach = self.radius_table[self.image_index * 360 + self.rotation] + sprite.radius
+        candidates = np.flatnonzero(dx * dx + dy * dy <= reach * reach).tolist()
+        return self.pop([index for index in candidates if self.collide_mask(index, sprite)])
+
+    def collide_mask(self, index, sprite):
+        """Pixel test between one asteroid and a sprite"""
+        mask = self.mask_table[self.image_index[index] * 360 + self.rotation[index]]
+        offset = (sprite.rect.x - int(self.x[index]), sprite.rect.y - int(self.y[index]))
+        return mask.overlap(collision.get_mask(sprite), offset) is not None
+
+    def pop(self, indices):
+        """Kill asteroids by index and return their centres"""
+        centers = [self.get_center(index) for index in indices]
+        if indices:
+            self.kill(indices)
+        return centers
+
+# -- Parity Check --
+def check_parity(image_list, count=200, frames=600, seed=0):
+    """Run Blocks and a field side by side from the same seed.
+
+    Returns the first frame whose asteroid rects or rotations differ,
+    or None if they matched for every frame.
+    """
+    import random
+    import core
+
+    block_clock, field_clock = core.VirtualClock(), core.VirtualClock()
+    block_rng, field_rng = random.Random(seed), random.Random(seed)
+    blocks = pygame.sprite.Group(core.Block(image_list, block_clock, block_rng) for _ in range(count))
+    field = AsteroidField(image_list, field_clock, field_rng)
+    for _ in range(count):
+        field.spawn()
+
+    for frame in range(frames):
+        block_clock.advance()
+        field_clock.advance()
+        blocks.update()
+        field.update()
+        block_state = [(tuple(block.rect), block.rotation) for block in blocks]
+        field_state = [(tuple(rect), rotation) for rect, rotation in zip(field.get_rects(), field.rotation.tolist())]
+        if block_state != field_state:
+            return frame
+    return None
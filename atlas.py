@@ -0,0 +1,86 @@
+import pygame
+
+# -- Constants --
+ATLAS_MAX_WIDTH = 1024  # Widest atlas surface in pixels; frames wrap onto new shelves
+ATLAS_PADDING = 1  # Empty pixels between frames so scaled/rotated reads never bleed
+
+# -- Packing --
+def pack_rects(sizes, max_width=ATLAS_MAX_WIDTH, padding=ATLAS_PADDING):
+    """Place sizes on horizontal shelves, tallest first.
+
+    Returns one Rect per size (in the input order) and the (width, height)
+    of the surface needed to hold them all.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (sizes[i][1], sizes[i][0]), reverse=True)
+    rects = [None] * len(sizes)
+    x = y = shelf_height = used_width = 0
+    for index in order:
+        width, height = sizes[index]
+        if x and x + width > max_width:
+            # Start a new shelf below the current one
+            y += shelf_height + padding
+            x = shelf_height = 0
+        rects[index] = pygame.Rect(x, y, width, height)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+        used_width = max(used_width, x - padding)
+    return rects, (used_width, y + shelf_height)
+
+def get_surface_bytes(surface):
+    """Pixel memory owned by a surface (a subsurface owns none)"""
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+# -- Atlas --
+class Atlas:
+    """Many frames packed into one surface with a rect table.
+
+    Frames are drawn either with blit(target, key, dest), which blits
+    the atlas with area=rect, or through get_frame(key), a subsurface
+    sharing the atlas pixels for code that needs a sprite image.
+    """
+
+    def __init__(self, frames, max_width=ATLAS_MAX_WIDTH, padding=ATLAS_PADDING):
+        keys = list(frames)
+        rects, size = pack_rects([frames[key].get_size() for key in keys], max_width, padding)
+        self.surface = pygame.Surface((max(1, size[0]), max(1, size[1])), pygame.SRCALPHA).convert_alpha()
+        self.surface.fill((0, 0, 0, 0))
+        self.rects = dict(zip(keys, rects))
+        for key, rect in self.rects.items():
+            self.surface.blit(frames[key], rect)
+        self.frames = {key: self.surface.subsurface(rect) for key, rect in self.rects.items()}
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __contains__(self, key):
+        return key in self.rects
+
+    def get_rect(self, key):
+        return self.rects[key]
+
+    def get_frame(self, key):
+        """Subsurface of the atlas holding one frame"""
+        return self.frames[key]
+
+    def blit(self, target, key, dest):
+        """Draw one frame onto target at dest"""
+        return target.blit(self.surface, dest, self.rects[key])
+
+    def get_memory_report(self, originals):
+        """Compare pixel memory of the separate originals with this atlas.
+
+        originals maps the same keys to the surfaces the atlas replaced.
+        """
+        frame_area = sum(rect.width * rect.height for rect in self.rects.values())
+        atlas_area = self.surface.get_width() * self.surface.get_height()
+        return {
+            'frames': len(self.rects),
+            'surfaces_before': len(originals),
+            'bytes_before': sum(get_surface_bytes(surface) for surface in originals.values()),
+            'surfaces_after': 1,
+            'bytes_after': get_surface_bytes(self.surface),
+            'atlas_size': self.surface.get_size(),
+            'fill_ratio': frame_area / atlas_area
+        }
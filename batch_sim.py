@@ -0,0 +1,177 @@
+"""Batch simulator: many headless bot games across a process pool, for balance sweeps and soak tests.
+
+Every game gets its own seed and runs until game over or the frame
+limit. Results are aggregated per tuning combination: score, survival
+time, peak sprite count and simulation cost per frame.
+
+Usage:
+    python batch_sim.py [--games N] [--frames N] [--workers N] [--seed S]
+                        [--set name=value ...] [--sweep name=v1,v2,... ...] [--json results.json]
+
+Tunable names: asteroid_spawn_delay, min_asteroids, powerup_spawn_delay,
+powerup_chance, shoot_cooldown
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import random
+import time
+import game
+import headless
+
+# -- Constants --
+DEFAULT_GAMES = 200
+DEFAULT_FRAMES = 3600  # One minute of game time per game at most
+SESSION_TUNABLES = ['asteroid_spawn_delay', 'min_asteroids', 'powerup_spawn_delay', 'powerup_chance']
+PLAYER_TUNABLES = ['shoot_cooldown']
+
+# -- Worker --
+# Each worker process opens a hidden display and loads the assets once,
+# then plays many games with them.
+worker_assets = None
+
+def init_worker():
+    global worker_assets
+    headless.init_headless()
+    worker_assets = game.load_assets(random.Random(0))
+
+def apply_tuning(session, tuning):
+    """Set tuning values on the session or its player"""
+    for name, value in tuning.items():
+        target = session.player if name in PLAYER_TUNABLES else session
+        setattr(target, name, value)
+
+def play_game(task):
+    """Play one bot game; task is (combination index, tuning, seed, frames)"""
+    index, tuning, seed, frames = task
+    session = headless.create_session(worker_assets, seed)
+    apply_tuning(session, tuning)
+    input_source = session.input_source
+    peak_sprites = 0
+    step_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        input_source.next_frame()
+        for key in input_source.get_keydowns():
+            session.handle_key(key)
+        session.step()
+        session.clock.advance()
+        step_times.append((time.perf_counter() - start) * 1000)
+        peak_sprites = max(peak_sprites, len(session.all_sprites) + len(session.field or ()))
+        if session.game_sub_state != "PLAYING":
+            break
+    return index, {
+        'score': session.score,
+        'survival_s': session.frame * headless.STEP_MS / 1000,
+        'survived': session.game_sub_state == "PLAYING",
+        'peak_sprites': peak_sprites,
+        'step_ms': sum(step_times) / len(step_times),
+        'step_ms_max': max(step_times)
+    }
+
+# -- Batch --
+def get_combinations(fixed, sweeps):
+    """Every tuning dict from fixed values plus the cartesian product of the sweeps"""
+    names = list(sweeps)
+    combinations = []
+    for values in itertools.product(*(sweeps[name] for name in names)):
+        tuning = dict(fixed)
+        tuning.update(zip(names, values))
+        combinations.append(tuning)
+    return combinations
+
+def run_batch(combinations, games=DEFAULT_GAMES, frames=DEFAULT_FRAMES, workers=None, seed=0):
+    """Play games per tuning combination on a process pool; returns one summary per combination"""
+    workers = workers or os.cpu_count() or 1
+    tasks = [(index, tuning, seed + game_index, frames)
+             for index, tuning in enumerate(combinations) for game_index in range(games)]
+    # Small chunks keep every worker busy even though game lengths vary a lot
+    chunksize = max(1, len(tasks) // (workers * 16))
+    results = [[] for _ in combinations]
+    with multiprocessing.Pool(workers, initializer=init_worker) as pool:
+        for index, result in pool.imap_unordered(play_game, tasks, chunksize):
+            results[index].append(result)
+        # Let the workers exit on their own: SDL swallows the SIGTERM
+        # that terminate() (used when the with block ends) would send
+        pool.close()
+        pool.join()
+    return [summarize(tuning, games) for tuning, games in zip(combinations, results)]
+
+def summarize(tuning, results):
+    scores = sorted(result['score'] for result in results)
+    count = len(results)
+    return {
+        'tuning': tuning,
+        'games': count,
+        'score_mean': sum(scores) / count,
+        'score_median': scores[count // 2],
+        'score_max': scores[-1],
+        'survival_s_mean': sum(result['survival_s'] for result in results) / count,
+        'survived_pct': 100 * sum(result['survived'] for result in results) / count,
+        'peak_sprites': max(result['peak_sprites'] for result in results),
+        'step_ms_mean': sum(result['step_ms'] for result in results) / count,
+        'step_ms_max': max(result['step_ms_max'] for result in results)
+    }
+
+# -- Helpers --
+def parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def parse_assignment(text, parser, multiple=False):
+    """'name=1' -> ('name', 1); with multiple, 'name=1,2' -> ('name', [1, 2])"""
+    name, _, values = text.partition('=')
+    if name not in SESSION_TUNABLES + PLAYER_TUNABLES or not values:
+        parser.error(f"expected tunable=value, got {text!r}")
+    if multiple:
+        return name, [parse_value(value) for value in values.split(',')]
+    return name, parse_value(values)
+
+def print_summaries(summaries):
+    header = (f"{'tuning':<40}{'games':>6}{'score':>8}{'median':>8}{'max':>7}"
+              f"{'surv s':>8}{'alive%':>7}{'sprites':>8}{'ms/step':>8}{'max ms':>8}")
+    print(header)
+    for summary in summaries:
+        tuning = " ".join(f"{name}={value}" for name, value in summary['tuning'].items()) or "(defaults)"
+        print(f"{tuning:<40}{summary['games']:6d}{summary['score_mean']:8.0f}{summary['score_median']:8d}"
+              f"{summary['score_max']:7d}{summary['survival_s_mean']:8.1f}{summary['survived_pct']:7.1f}"
+              f"{summary['peak_sprites']:8d}{summary['step_ms_mean']:8.3f}{summary['step_ms_max']:8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many headless bot games and aggregate the results")
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help="games per tuning combination")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help="frame limit per game")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help="fixed tuning value, e.g. min_asteroids=10")
+    parser.add_argument('--sweep', action='append', default=[], metavar='NAME=V1,V2',
+                        help="values to sweep, e.g. powerup_chance=10,15,25")
+    parser.add_argument('--json', metavar='PATH', help="write summaries to a JSON file")
+    args = parser.parse_args()
+
+    fixed = dict(parse_assignment(text, parser) for text in args.set)
+    sweeps = dict(parse_assignment(text, parser, multiple=True) for text in args.sweep)
+    combinations = get_combinations(fixed, sweeps)
+
+    start = time.perf_counter()
+    summaries = run_batch(combinations, args.games, args.frames, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+    print_summaries(summaries)
+    total_games = args.games * len(combinations)
+    print(f"{total_games} games in {elapsed:.1f} s ({total_games / elapsed:.1f} games/s)")
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({'games': args.games, 'frames': args.frames, 'seed': args.seed,
+                       'summaries': summaries}, file, indent=2)
+        print(f"Saved {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""Scenario benchmark suite: frame-time percentiles and peak memory as JSON.
+
+Every scenario runs in its own process so its peak memory is measured
+separately. Save results per commit and diff the JSON files to spot
+regressions.
+
+Usage:
+    python bench_suite.py [scenario ...] [--frames N] [--json results.json]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+import core
+import game
+import headless
+import menu
+from render import Renderer, BrightnessFilter
+
+try:
+    import resource
+except ImportError:  # Unix only; peak memory comes from psutil or tracemalloc instead
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# -- Constants --
+DEFAULT_FRAMES = 600
+BRIGHTNESS = 0.8  # Default menu.settings brightness, so the post-process runs too
+
+# -- Scenario Setup --
+# Each setup gets a fresh GameSession before the first frame and returns a
+# per-frame hook (or None) run before every step.
+def keep_alive(session):
+    """Refill the player's health so a scenario never ends in GAME_OVER"""
+    session.player.health = session.player.max_health
+
+def fill_asteroids(session, count):
+    """Top up the asteroid field to count and keep it there"""
+    session.min_asteroids = count
+    while session.get_asteroid_count() < count:
+        session.spawn_new_block()
+
+def setup_asteroids_8(session):
+    return keep_alive
+
+def setup_asteroids_500(session):
+    fill_asteroids(session, 500)
+    return keep_alive
+
+def setup_rocket_chain(session):
+    fill_asteroids(session, 60)
+
+    def hook(session):
+        keep_alive(session)
+        session.player.activate_rocket_boost()
+        session.player.activate_ammo_boost()  # More bullets -> more chain reactions
+    return hook
+
+def setup_energy_clear(session, count=30):
+    fill_asteroids(session, count)
+
+    def hook(session):
+        keep_alive(session)
+        if session.frame % 180 == 0:
+            # Same effect as collecting an Energy powerup
+            session.start_energy_clear()
+    return hook
+
+def setup_energy_clear_500(session):
+    return setup_energy_clear(session, 500)
+
+def setup_max_bullets(session):
+    def hook(session):
+        keep_alive(session)
+        session.player.activate_ammo_boost()
+    return hook
+
+SCENARIOS = {
+    'idle_menu': None,  # Drawn by run_menu_scenario
+    'asteroids_8': setup_asteroids_8,
+    'asteroids_500': setup_asteroids_500,
+    'asteroids_500_field': setup_asteroids_500,
+    'rocket_chain': setup_rocket_chain,
+    'energy_clear': setup_energy_clear,
+    'energy_clear_500': setup_energy_clear_500,
+    'max_bullets_ammo': setup_max_bullets,
+}
+FIELD_SCENARIOS = {'asteroids_500_field'}  # Run with the NumPy AsteroidField
+
+# -- Running --
+def get_memory_source():
+    """Where get_peak_rss_kb reads from; tracemalloc only sees Python allocations"""
+    if resource is not None:
+        return 'rusage'
+    return 'psutil' if psutil is not None else 'tracemalloc'
+
+def get_peak_rss_kb():
+    """Peak resident memory of this process so far (ru_maxrss is KB on Linux)"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) // 1024  # peak_wset is the Windows peak
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return tracemalloc.get_traced_memory()[1] // 1024
+
+def run_menu_scenario(screen, frames):
+    """Time the main menu while nobody touches it, frame for frame as menu.menu_loop.
+
+    Like the real menu, unchanged frames are skipped through the renderer's
+    scene key and no brightness post-process is applied.
+    """
+    ship_variants = [core.get_ship_variants(game.GAME_ASSETS_FOLDER, name, menu.SHIP_PREVIEW_SIZE)
+                     for name in game.SHIP_NAMES]
+    selected_ship = 0
+    ship_display = menu.ShipDisplay(ship_variants)
+    renderer = Renderer(screen, menu.settings['dirty_rendering'])
+    frame_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        ship_display.update()
+        if renderer.needs_redraw(menu.get_menu_scene_key(ship_display, selected_ship)):
+            menu.draw_menu_frame(screen, ship_display, selected_ship)
+            renderer.present_full()
+        else:
+            renderer.skip_frame()
+        frame_times.append((time.perf_counter() - start) * 1000)
+    return frame_times, {'skipped_frames': renderer.skipped_frames}
+
+def run_game_scenario(screen, assets, setup, frames, seed, asteroid_field=False):
+    """Time full game frames (input, step, draw) on a virtual clock"""
+    session = headless.create_session(assets, seed, asteroid_field=asteroid_field)
+    hook = setup(session)
+    renderer = Renderer(screen, menu.settings['dirty_rendering'])
+    brightness = BrightnessFilter(BRIGHTNESS)
+    input_source = session.input_source
+    frame_times = []
+    peak_sprites = 0
+    for _ in range(frames):
+        start = time.perf_counter()
+        if hook is not None:
+            hook(session)
+        input_source.next_frame()
+        for key in input_source.get_keydowns():
+            session.handle_key(key)
+        session.step()
+        commands = session.get_draw_commands() + session.get_hud_commands()
+        renderer.render(commands, brightness, session.get_state_commands())
+        session.clock.advance()
+        frame_times.append((time.perf_counter() - start) * 1000)
+        peak_sprites = max(peak_sprites, len(session.all_sprites) + (len(session.field) if session.field is not None else 0))
+    return frame_times, {'score': session.score, 'state': session.game_sub_state, 'peak_sprites': peak_sprites}
+
+def run_scenario(name, frames=DEFAULT_FRAMES, seed=0):
+    """Run one scenario in this process and return its result dict"""
+    get_peak_rss_kb()  # Starts tracemalloc before setup when it is the only source
+    screen = headless.init_headless()
+    assets = game.load_assets(random.Random(seed))
+    setup_rss_kb = get_peak_rss_kb()
+    if name == 'idle_menu':
+        frame_times, extra = run_menu_scenario(screen, frames)
+    else:
+        frame_times, extra = run_game_scenario(screen, assets, SCENARIOS[name], frames, seed,
+                                               name in FIELD_SCENARIOS)
+    total_ms = sum(frame_times)
+    result = {
+        'frames': frames,
+        'fps': 1000 * frames / total_ms if total_ms else 0.0,
+        'frame_ms': percentiles(frame_times),
+        'peak_rss_kb': get_peak_rss_kb(),
+        'setup_rss_kb': setup_rss_kb,  # Peak before the first frame (display + assets)
+        'memory_source': get_memory_source()
+    }
+    result.update(extra)
+    pygame.quit()
+    return result
+
+def run_suite(names, frames=DEFAULT_FRAMES, seed=0):
+    """Run scenarios one per fresh process, so peak memory is per scenario"""
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[name] = executor.submit(run_scenario, name, frames, seed).result()
+    return results
+
+# -- Helpers --
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of samples, plus min/max/mean"""
+    ordered = sorted(samples)
+    stats = {'min': ordered[0], 'mean': sum(ordered) / len(ordered), 'max': ordered[-1]}
+    for point in points:
+        stats[f'p{point}'] = ordered[min(len(ordered) - 1, int(len(ordered) * point / 100))]
+    return {key: round(value, 4) for key, value in stats.items()}
+
+def get_commit():
+    """Short git hash of the working tree, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results):
+    header = f"{'scenario':<18}{'fps':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'peak MB':>9}"
+    print(header)
+    for name, result in results.items():
+        frame_ms = result['frame_ms']
+        print(f"{name:<18}{result['fps']:9.1f}{frame_ms['p50']:8.2f}{frame_ms['p95']:8.2f}"
+              f"{frame_ms['p99']:8.2f}{result['peak_rss_kb'] / 1024:9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scenario benchmark suite headless")
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f"scenarios to run (default: all): {', '.join(SCENARIOS)}")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help="write results to a JSON file")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    names = args.scenarios or list(SCENARIOS)
+    results = run_suite(names, args.frames, args.seed)
+    print_results(results)
+    if args.json:
+        report = {
+            'commit': get_commit(),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'frames': args.frames,
+            'seed': args.seed,
+            'scenarios': results
+        }
+        with open(args.json, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved {args.json}")
+
+if __name__ == '__main__':
+    main()
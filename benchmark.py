@@ -0,0 +1,359 @@
+"""Headless performance benchmarks for the game systems.
+
+Usage:
+    python benchmark.py rotation [--frames N]
+    python benchmark.py collision
+    python benchmark.py render [--frames N]
+    python benchmark.py assets
+    python benchmark.py startup
+    python benchmark.py coldstart  (cook the pack first: python asset_pack.py)
+    python benchmark.py atlas [--frames N]
+    python benchmark.py field [--frames N]
+    python benchmark.py kernel
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import random
+import time
+import pygame
+import collision
+import core
+import game
+import headless
+import menu
+from render import Renderer, BrightnessFilter
+from asset_manager import asset_manager
+from asset_pack import load_pack
+from atlas import Atlas
+import asteroid_field
+from rotation_cache import RotationCache, ROTATION_STEPS, rotation_cache
+
+# -- Constants --
+HEIGHT = 700
+WIDTH = 1000
+
+# -- Setup Helpers --
+def init_headless():
+    """Create a hidden display so convert_alpha and blits work"""
+    pygame.init()
+    return pygame.display.set_mode((WIDTH, HEIGHT))
+
+def print_table(headers, rows):
+    """Print results as an aligned text table"""
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(v).ljust(w) for v, w in zip(row, widths)))
+
+# -- Benchmarks --
+def bench_rotation(screen, frames=120, counts=(8, 100, 1000)):
+    """Frame time of asteroid update + draw, live rotate vs rotation cache.
+
+    Every asteroid is forced to rotate each frame, which is the worst-case
+    frame of the real game (rotation fires every 50 ms).
+    """
+    meteor_images = game.load_assets(random.Random(0))['meteor_images']
+    modes = [('live rotate', 0), (f'cache ({ROTATION_STEPS} steps)', ROTATION_STEPS)]
+    rows = []
+    for count in counts:
+        for label, steps in modes:
+            core.rotation_cache = RotationCache(steps=steps)
+            core.rotation_cache.prebuild(meteor_images)
+            random.seed(count)
+            blocks = pygame.sprite.Group(core.Block(meteor_images) for _ in range(count))
+
+            start = time.perf_counter()
+            for _ in range(frames):
+                for block in blocks:
+                    block.last_update -= 51
+                blocks.update()
+                screen.fill((0, 0, 0))
+                blocks.draw(screen)
+            elapsed = time.perf_counter() - start
+
+            frame_ms = elapsed * 1000 / frames
+            rows.append([count, label, f"{frame_ms:.3f}", f"{1000 / frame_ms:.0f}"])
+    print_table(['asteroids', 'mode', 'ms/frame', 'fps'], rows)
+
+class BenchSprite(pygame.sprite.Sprite):
+    """Bare sprite with a rect and radius, used for collision benchmarks"""
+    def __init__(self, rect):
+        super().__init__()
+        self.rect = rect
+        self.radius = int(rect.width * 0.85 / 2)
+
+def make_collision_groups(count, rng):
+    """Random asteroid-sized enemies and bullet-sized projectiles"""
+    enemies = pygame.sprite.Group()
+    projectiles = pygame.sprite.Group()
+    for _ in range(count):
+        size = rng.randint(40, 70)
+        enemies.add(BenchSprite(pygame.Rect(rng.randrange(WIDTH), rng.randrange(HEIGHT), size, size)))
+        projectiles.add(BenchSprite(pygame.Rect(rng.randrange(WIDTH), rng.randrange(HEIGHT), 15, 35)))
+    return enemies, projectiles
+
+def bench_collision(screen, frames=120, counts=(10, 100, 1000, 5000)):
+    """pygame.sprite.groupcollide vs the spatial hash, N enemies x N projectiles"""
+    rows = []
+    for count in counts:
+        enemies, projectiles = make_collision_groups(count, random.Random(count))
+        repeats = max(1, min(frames, 200000 // (count * count) + 1))
+        results = {}
+        for label, func in (('pygame', pygame.sprite.groupcollide), ('spatial hash', collision.groupcollide)):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                hits = func(enemies, projectiles, False, False)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / repeats
+            results[label] = hits
+            pairs = sum(len(v) for v in hits.values())
+            rows.append([count, label, f"{elapsed_ms:.3f}", pairs])
+        same = 'yes' if results['pygame'] == results['spatial hash'] else 'NO'
+        rows[-2].append('')
+        rows[-1].append(same)
+    print_table(['entities', 'method', 'ms/call', 'hit pairs', 'same result'], rows)
+
+def describe_hits(hits):
+    """Collision result as plain rect tuples, comparable across separate groups"""
+    return sorted((tuple(a.rect), tuple(tuple(b.rect) for b in bs)) for a, bs in hits.items())
+
+def bench_kernel(screen, frames=120, counts=(100, 500, 1000, 5000)):
+    """pygame.sprite.groupcollide vs the NumPy kernels, rect and circle tests"""
+    if not collision.is_vectorized_available():
+        print("NumPy is not installed")
+        return
+    rows = []
+    for collided, test in ((None, 'rect'), (pygame.sprite.collide_circle, 'circle')):
+        for count in counts:
+            timings = {}
+            results = {}
+            for label, vectorized in (('pygame', False), ('numpy', True)):
+                enemies, projectiles = make_collision_groups(count, random.Random(count))
+                repeats = max(1, min(frames, 200000 // (count * count) + 1))
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    if vectorized:
+                        hits = collision.vectorized_groupcollide(enemies, projectiles, False, False, collided)
+                    else:
+                        hits = pygame.sprite.groupcollide(enemies, projectiles, False, False, collided)
+                timings[label] = (time.perf_counter() - start) * 1000 / repeats
+                # The game kills both sides, which must also match
+                if vectorized:
+                    killed = collision.vectorized_groupcollide(enemies, projectiles, True, True, collided)
+                else:
+                    killed = pygame.sprite.groupcollide(enemies, projectiles, True, True, collided)
+                results[label] = (describe_hits(hits), describe_hits(killed))
+            same = 'yes' if results['pygame'] == results['numpy'] else 'NO'
+            rows.append([test, f"{count}x{count}", f"{timings['pygame']:.3f}", f"{timings['numpy']:.3f}",
+                         f"{timings['pygame'] / timings['numpy']:.1f}x", len(results['numpy'][0]), same])
+    print_table(['test', 'pairs', 'pygame ms', 'numpy ms', 'speedup', 'hits', 'same result'], rows)
+
+def bench_render(screen, frames=600):
+    """Pixels pushed/blitted per frame: full redraw vs dirty rects, playing and paused"""
+    assets = game.load_assets(random.Random(0))
+    brightness = BrightnessFilter(0.8)  # Default brightness setting
+    rows = []
+    for scene in ('playing', 'paused'):
+        for dirty in (False, True):
+            session = headless.create_session(assets, seed=1)
+            renderer = Renderer(screen, dirty)
+            start = time.perf_counter()
+            for frame in range(frames):
+                session.player.health = session.player.max_health  # Keep the bot alive
+                session.input_source.next_frame()
+                for key in session.input_source.get_keydowns():
+                    session.handle_key(key)
+                if scene == 'paused' and frame == 1:
+                    session.handle_key(pygame.K_p)
+                session.step()
+                commands = session.get_draw_commands() + session.get_hud_commands()
+                renderer.render(commands, brightness, session.get_state_commands())
+                session.clock.advance()
+            elapsed_ms = (time.perf_counter() - start) * 1000 / frames
+            stats = renderer.get_stats()
+            rows.append([scene, 'dirty rects' if dirty else 'full redraw', f"{elapsed_ms:.3f}",
+                         f"{stats['pushed_per_frame']:.0f}", f"{stats['blitted_per_frame']:.0f}",
+                         stats['skipped_frames']])
+    print_table(['scene', 'mode', 'ms/frame', 'pixels pushed/frame', 'pixels blitted/frame', 'skipped'], rows)
+
+def bench_assets(screen, frames=120):
+    """Per-asset load times, and the disk reads/time of a first start vs a restart"""
+    rows = []
+    for label in ('first start', 'restart'):
+        disk_loads = asset_manager.disk_loads
+        start = time.perf_counter()
+        assets = game.load_assets(random.Random(0))
+        headless.create_session(assets, seed=0)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rows.append([label, f"{elapsed_ms:.2f}", asset_manager.disk_loads - disk_loads])
+    asset_manager.print_report()
+    print()
+    print_table(['run', 'ms', 'files read'], rows)
+
+def reset_asset_caches():
+    """Drop every loaded asset so the next load is a cold start again"""
+    asset_manager.clear()
+    rotation_cache.clear()
+    core.ship_variant_cache.clear()
+
+def load_menu_assets():
+    """Everything the main menu needs before it can draw its first frame"""
+    assets = game.load_assets(random.Random(0))
+    ship_variants = [core.get_ship_variants(game.GAME_ASSETS_FOLDER, name, menu.SHIP_PREVIEW_SIZE) for name in game.SHIP_NAMES]
+    return assets, ship_variants
+
+def bench_startup(screen, frames=120):
+    """Time to first frame and time until the menu is ready, sync vs background loading"""
+    load_menu_assets()  # Warm the OS file cache so both runs read equally fast
+    rows = []
+    for label in ('sync', 'threaded'):
+        reset_asset_caches()
+        start = time.perf_counter()
+        if label == 'sync':
+            load_menu_assets()
+            screen.fill((0, 0, 0))
+            pygame.display.flip()
+            first_frame = time.perf_counter()
+        else:
+            job = asset_manager.preload(game.get_image_manifest())
+            menu.draw_loading_frame(screen, job.poll())
+            pygame.display.flip()
+            first_frame = time.perf_counter()
+            loading_frames = 1
+            while not job.is_done():
+                menu.draw_loading_frame(screen, job.poll())
+                pygame.display.flip()
+                loading_frames += 1
+            load_menu_assets()
+        ready = time.perf_counter()
+        rows.append([label, f"{(first_frame - start) * 1000:.2f}", f"{(ready - start) * 1000:.2f}",
+                     loading_frames if label == 'threaded' else 0])
+    print_table(['loading', 'first frame ms', 'menu ready ms', 'loading frames'], rows)
+
+def bench_coldstart(screen, frames=120):
+    """Cold-start load of every image, from PNG files vs from the cooked asset pack"""
+    load_menu_assets()  # Warm the OS file cache so both runs read equally fast
+    rows = []
+    loaded = {}
+    for label in ('png', 'pack'):
+        reset_asset_caches()
+        start = time.perf_counter()
+        asset_manager.set_pack(load_pack() if label == 'pack' else None)
+        if label == 'pack' and asset_manager.pack is None:
+            print("No asset pack found, run: python asset_pack.py")
+            return
+        assets, _ = load_menu_assets()
+        for ship_index in range(len(game.SHIP_NAMES)):
+            headless.create_session(assets, seed=0, selected_ship=ship_index)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        loaded[label] = {key: pygame.image.tobytes(image, 'RGBA') for key, image in asset_manager.images.items()}
+        rows.append([label, f"{elapsed_ms:.2f}", asset_manager.disk_loads, asset_manager.pack_loads])
+    asset_manager.set_pack(None)
+
+    same = loaded['png'].keys() == loaded['pack'].keys() and all(
+        loaded['png'][key] == loaded['pack'][key] for key in loaded['png'])
+    print_table(['source', 'ms', 'files read', 'from pack'], rows)
+    print(f"identical pixels: {same}")
+
+def bench_atlas(screen, frames=120):
+    """Memory of every frame set as separate surfaces vs one atlas, and blit cost"""
+    reset_asset_caches()
+    rows = []
+    all_originals = {}
+    for name, keys in game.get_frame_sets(include_unused=True).items():
+        originals = {key: asset_manager.image(*key) for key in keys if os.path.exists(key[0])}
+        all_originals.update(originals)
+        report = Atlas(originals).get_memory_report(originals)
+        rows.append([name, report['frames'], report['bytes_before'], report['bytes_after'],
+                     f"{report['atlas_size'][0]}x{report['atlas_size'][1]}", f"{report['fill_ratio']:.0%}"])
+    atlas = Atlas(all_originals)
+    report = atlas.get_memory_report(all_originals)
+    rows.append(['all sets', report['frames'], report['bytes_before'], report['bytes_after'],
+                 f"{report['atlas_size'][0]}x{report['atlas_size'][1]}", f"{report['fill_ratio']:.0%}"])
+    print_table(['frame set', 'frames', 'bytes before', 'bytes after', 'atlas', 'fill'], rows)
+    print(f"surfaces: {report['surfaces_before']} before, {report['surfaces_after']} after")
+
+    # Draw every frame once per benchmark frame
+    positions = [((i * 83) % (WIDTH - 80), (i * 47) % (HEIGHT - 80)) for i in range(len(all_originals))]
+    timings = []
+    for label in ('separate', 'atlas area'):
+        start = time.perf_counter()
+        for _ in range(frames):
+            if label == 'separate':
+                for surface, dest in zip(all_originals.values(), positions):
+                    screen.blit(surface, dest)
+            else:
+                for key, dest in zip(all_originals, positions):
+                    atlas.blit(screen, key, dest)
+        timings.append([label, f"{(time.perf_counter() - start) * 1000 / frames:.3f}"])
+    print()
+    print_table(['blit', 'ms/frame'], timings)
+
+def bench_field(screen, frames=120, counts=(100, 1000, 5000)):
+    """Block sprites vs the NumPy AsteroidField: update and draw-command cost"""
+    if not asteroid_field.is_available():
+        print("NumPy is not installed")
+        return
+    assets = game.load_assets(random.Random(0))
+    images = assets['meteor_images']
+    rows = []
+    for count in counts:
+        timings = []
+        for mode in ('Block', 'field'):
+            clock = core.VirtualClock()
+            rng = random.Random(0)
+            if mode == 'Block':
+                blocks = pygame.sprite.Group(core.Block(images, clock, rng) for _ in range(count))
+                update = blocks.update
+                get_commands = lambda: [(block.image, block.rect) for block in blocks]
+            else:
+                field = asteroid_field.AsteroidField(images, clock, rng)
+                for _ in range(count):
+                    field.spawn()
+                update = field.update
+                get_commands = field.get_draw_commands
+            update_time = commands_time = 0.0
+            for _ in range(frames):
+                clock.advance()
+                start = time.perf_counter()
+                update()
+                middle = time.perf_counter()
+                get_commands()
+                update_time += middle - start
+                commands_time += time.perf_counter() - middle
+            timings.append((update_time * 1000 / frames, commands_time * 1000 / frames))
+
+        (block_update, block_commands), (field_update, field_commands) = timings
+        parity = asteroid_field.check_parity(images, count, frames=min(frames, 300))
+        rows.append([count, f"{block_update:.3f}", f"{field_update:.3f}", f"{block_update / field_update:.1f}x",
+                     f"{block_commands:.3f}", f"{field_commands:.3f}",
+                     'yes' if parity is None else f"differs at frame {parity}"])
+    print_table(['asteroids', 'Block update ms', 'field update ms', 'speedup',
+                 'Block commands ms', 'field commands ms', 'same result'], rows)
+
+BENCHMARKS = {
+    'rotation': bench_rotation,
+    'collision': bench_collision,
+    'render': bench_render,
+    'assets': bench_assets,
+    'startup': bench_startup,
+    'coldstart': bench_coldstart,
+    'atlas': bench_atlas,
+    'field': bench_field,
+    'kernel': bench_kernel,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless performance benchmarks")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), nargs='?', default='rotation')
+    parser.add_argument('--frames', type=int, default=120)
+    args = parser.parse_args()
+
+    screen = init_headless()
+    BENCHMARKS[args.benchmark](screen, frames=args.frames)
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
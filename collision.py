@@ -0,0 +1,333 @@
+import pygame
+from rotation_cache import get_tight_radius
+
+try:
+    import numpy as np
+except ImportError:  # Vectorized collisions are optional
+    np = None
+
+# -- Constants --
+CELL_SIZE = 64  # Grid cell size in pixels, about one asteroid wide
+BRUTE_FORCE_PAIRS = 4096  # Below this many pairs the plain pygame calls are faster
+CHUNK_PAIRS = 1 << 18  # Most pairs tested at once by the NumPy kernels (bounds temp memory)
+
+# -- Masks --
+surface_masks = {}  # Surface -> Mask, for sprites without a mask of their own
+surface_radii = {}  # Surface -> tight radius of its mask
+
+def prebuild_masks(surfaces):
+    """Build masks for surfaces up front so collisions never call from_surface"""
+    for surface in surfaces:
+        if surface not in surface_masks:
+            surface_masks[surface] = pygame.mask.from_surface(surface)
+
+def get_mask(sprite):
+    """The sprite's own mask (e.g. a rotation step's), else the cached mask of its image"""
+    try:
+        return sprite.mask
+    except AttributeError:
+        mask = surface_masks.get(sprite.image)
+        if mask is None:
+            mask = surface_masks[sprite.image] = pygame.mask.from_surface(sprite.image)
+        return mask
+
+def get_surface_radius(surface):
+    """Tight radius of a surface's opaque pixels around its centre, computed once per surface.
+
+    Sprites tested with collide_circle_mask need a radius at least this
+    big, or the circle broadphase drops real pixel hits.
+    """
+    radius = surface_radii.get(surface)
+    if radius is None:
+        prebuild_masks([surface])
+        radius = surface_radii[surface] = get_tight_radius(surface_masks[surface])
+    return radius
+
+def collide_masks(left, right):
+    """Pixel test between two sprites positioned by their rects"""
+    offset = (right.rect.x - left.rect.x, right.rect.y - left.rect.y)
+    return get_mask(left).overlap(get_mask(right), offset) is not None
+
+def collide_rect_mask(left, right):
+    """Rect broadphase, then pixel test"""
+    return left.rect.colliderect(right.rect) and collide_masks(left, right)
+
+def collide_circle_mask(left, right):
+    """Circle broadphase (radius attributes), then pixel test"""
+    return pygame.sprite.collide_circle(left, right) and collide_masks(left, right)
+
+MASK_TESTS = (collide_rect_mask, collide_circle_mask)
+CIRCLE_TESTS = (pygame.sprite.collide_circle, collide_circle_mask)
+
+# -- Broadphase Bounds --
+def get_bounds(sprite, collided):
+    """Return the (left, top, right, bottom) box a sprite can collide within"""
+    rect = sprite.rect
+    if collided in CIRCLE_TESTS:
+        try:
+            radius = sprite.radius
+        except AttributeError:
+            # Same approximation pygame.sprite.collide_circle uses
+            radius = 0.5 * ((rect.width ** 2 + rect.height ** 2) ** 0.5)
+            sprite.radius = radius
+        x, y = rect.center
+        return x - radius, y - radius, x + radius, y + radius
+    return rect.left, rect.top, rect.right - 1, rect.bottom - 1
+
+def supports_broadphase(collided):
+    """Only rect and circle tests (optionally refined by masks) have bounds we can compute up front"""
+    return collided in (None, pygame.sprite.collide_rect) + CIRCLE_TESTS + MASK_TESTS
+
+# -- Spatial Hash --
+class SpatialHash:
+    """Uniform grid bucketing sprites by the cells their bounds overlap.
+
+    Queries return only sprites sharing a cell with the given bounds,
+    sorted in insertion order so results match the order pygame's own
+    collide functions would produce.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE, collided=None):
+        self.cell_size = cell_size
+        self.collided = collided
+        self.cells = {}  # (cell_x, cell_y) -> list of sprites
+        self.order = {}  # sprite -> insertion index
+        self.sprite_cells = {}  # sprite -> list of cell keys
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, sprite):
+        return sprite in self.order
+
+    def clear(self):
+        """Remove every sprite from the grid"""
+        self.cells.clear()
+        self.order.clear()
+        self.sprite_cells.clear()
+
+    def get_cell_keys(self, bounds):
+        """List the grid cells a bounding box overlaps"""
+        cell_size = self.cell_size
+        left, top, right, bottom = bounds
+        min_x, max_x = int(left // cell_size), int(right // cell_size)
+        min_y, max_y = int(top // cell_size), int(bottom // cell_size)
+        return [(cx, cy) for cx in range(min_x, max_x + 1) for cy in range(min_y, max_y + 1)]
+
+    def insert(self, sprite):
+        """Add a sprite to every cell its bounds overlap"""
+        keys = self.get_cell_keys(get_bounds(sprite, self.collided))
+        cells = self.cells
+        for key in keys:
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [sprite]
+            else:
+                bucket.append(sprite)
+        self.order[sprite] = len(self.order)
+        self.sprite_cells[sprite] = keys
+
+    def remove(self, sprite):
+        """Take a sprite out of the grid (e.g. after it was killed)"""
+        keys = self.sprite_cells.pop(sprite, None)
+        if keys is None:
+            return
+        del self.order[sprite]
+        for key in keys:
+            bucket = self.cells[key]
+            bucket.remove(sprite)
+            if not bucket:
+                del self.cells[key]
+
+    def build(self, group):
+        """Rebuild the grid from all sprites in a group"""
+        self.clear()
+        for sprite in group:
+            self.insert(sprite)
+
+    def query(self, sprite):
+        """Return grid sprites that may collide with sprite, in insertion order"""
+        cells = self.cells
+        candidates = set()
+        for key in self.get_cell_keys(get_bounds(sprite, self.collided)):
+            bucket = cells.get(key)
+            if bucket:
+                candidates.update(bucket)
+        if len(candidates) > 1:
+            return sorted(candidates, key=self.order.__getitem__)
+        return list(candidates)
+
+# -- Vectorized Kernels --
+def is_vectorized_available():
+    """True if NumPy is installed"""
+    return np is not None
+
+def get_radius(sprite):
+    """Radius collide_circle uses for a sprite (stored on it like pygame does)"""
+    try:
+        return sprite.radius
+    except AttributeError:
+        rect = sprite.rect
+        sprite.radius = 0.5 * ((rect.width ** 2 + rect.height ** 2) ** 0.5)
+        return sprite.radius
+
+def get_circles(sprites):
+    """(centers_x, centers_y, radii) arrays for a list of sprites"""
+    centers = np.array([sprite.rect.center for sprite in sprites], dtype=np.float64).reshape(-1, 2)
+    radii = np.array([get_radius(sprite) for sprite in sprites], dtype=np.float64)
+    return centers[:, 0], centers[:, 1], radii
+
+def get_boxes(sprites):
+    """(left, top, right, bottom, non_empty) arrays for a list of sprites"""
+    rects = np.array([tuple(sprite.rect) for sprite in sprites], dtype=np.int64).reshape(-1, 4)
+    left, top = rects[:, 0], rects[:, 1]
+    non_empty = (rects[:, 2] > 0) & (rects[:, 3] > 0)  # Empty rects never collide
+    return left, top, left + rects[:, 2], top + rects[:, 3], non_empty
+
+def find_pairs(test, count_a, count_b, chunk_pairs=CHUNK_PAIRS):
+    """Run test(start, end) on row chunks of an a x b pair matrix.
+
+    test returns a boolean (end - start, count_b) matrix. Returns index
+    arrays (a, b) of every true pair, sorted by a then b.
+    """
+    rows = max(1, chunk_pairs // max(1, count_b))
+    found_a, found_b = [], []
+    for start in range(0, count_a, rows):
+        index_a, index_b = np.nonzero(test(start, min(count_a, start + rows)))
+        found_a.append(index_a + start)
+        found_b.append(index_b)
+    if not found_a:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    return np.concatenate(found_a), np.concatenate(found_b)
+
+def circle_pairs(circles_a, circles_b, chunk_pairs=CHUNK_PAIRS):
+    """Index pairs whose circles overlap (collide_circle), via broadcasting"""
+    ax, ay, ar = circles_a
+    bx, by, br = circles_b
+
+    def test(start, end):
+        dx = ax[start:end, None] - bx
+        dy = ay[start:end, None] - by
+        reach = ar[start:end, None] + br
+        return dx * dx + dy * dy <= reach * reach
+    return find_pairs(test, len(ax), len(bx), chunk_pairs)
+
+def box_pairs(boxes_a, boxes_b, chunk_pairs=CHUNK_PAIRS):
+    """Index pairs whose rects overlap (Rect.colliderect), via broadcasting"""
+    a_left, a_top, a_right, a_bottom, a_non_empty = boxes_a
+    b_left, b_top, b_right, b_bottom, b_non_empty = boxes_b
+
+    def test(start, end):
+        return ((a_left[start:end, None] < b_right) & (a_right[start:end, None] > b_left) &
+                (a_top[start:end, None] < b_bottom) & (a_bottom[start:end, None] > b_top) &
+                a_non_empty[start:end, None] & b_non_empty)
+    return find_pairs(test, len(a_left), len(b_left), chunk_pairs)
+
+def get_pairs(sprites_a, sprites_b, collided):
+    if collided in CIRCLE_TESTS:
+        index_a, index_b = circle_pairs(get_circles(sprites_a), get_circles(sprites_b))
+    else:
+        index_a, index_b = box_pairs(get_boxes(sprites_a), get_boxes(sprites_b))
+    if collided in MASK_TESTS and len(index_a):
+        # Pixel test only the pairs that passed the broadphase
+        keep = [collide_masks(sprites_a[a], sprites_b[b]) for a, b in zip(index_a.tolist(), index_b.tolist())]
+        keep = np.array(keep, bool)
+        index_a, index_b = index_a[keep], index_b[keep]
+    return index_a, index_b
+
+def vectorized_groupcollide(groupa, groupb, dokilla, dokillb, collided=None):
+    """pygame.sprite.groupcollide for rect or circle (plus mask) tests using the NumPy kernels.
+
+    Results match pygame: groupa is visited in order and, with dokillb,
+    a groupb sprite killed by an earlier hit is not hit again.
+    """
+    sprites_a, sprites_b = groupa.sprites(), groupb.sprites()
+    if not sprites_a or not sprites_b:
+        return {}
+    index_a, index_b = get_pairs(sprites_a, sprites_b, collided)
+    if not len(index_a):
+        return {}
+
+    crashed = {}
+    killed_b = np.zeros(len(sprites_b), bool)
+    starts = np.flatnonzero(np.diff(index_a, prepend=-1))
+    ends = np.append(starts[1:], len(index_a))
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        hits = index_b[start:end]
+        if dokillb:
+            hits = hits[~killed_b[hits]]
+            if not len(hits):
+                continue
+            killed_b[hits] = True
+        sprite = sprites_a[index_a[start]]
+        crashed[sprite] = [sprites_b[i] for i in hits.tolist()]
+        if dokillb:
+            for other in crashed[sprite]:
+                other.kill()
+        if dokilla:
+            sprite.kill()
+    return crashed
+
+def vectorized_spritecollide(sprite, group, dokill, collided=None):
+    """pygame.sprite.spritecollide for rect or circle (plus mask) tests using the NumPy kernels"""
+    sprites = group.sprites()
+    if not sprites:
+        return []
+    _, index_b = get_pairs([sprite], sprites, collided)
+    crashed = [sprites[i] for i in index_b.tolist()]
+    if dokill:
+        for other in crashed:
+            other.kill()
+    return crashed
+
+# -- Collision Functions --
+def spritecollide(sprite, group, dokill, collided=None, grid=None, vectorized=False):
+    """Drop-in for pygame.sprite.spritecollide, optionally using a prebuilt grid.
+
+    The grid must have been built from group with the same collided test.
+    Killed sprites are removed from the grid so it stays valid. With
+    vectorized=True (and NumPy installed) the NumPy kernel is used instead.
+    """
+    if vectorized and np is not None and supports_broadphase(collided):
+        return vectorized_spritecollide(sprite, group, dokill, collided)
+    if grid is None or not supports_broadphase(collided):
+        return pygame.sprite.spritecollide(sprite, group, dokill, collided)
+
+    if collided is None:
+        collide_rect = sprite.rect.colliderect
+        crashed = [other for other in grid.query(sprite) if collide_rect(other.rect)]
+    else:
+        crashed = [other for other in grid.query(sprite) if collided(sprite, other)]
+
+    if dokill:
+        for other in crashed:
+            other.kill()
+            grid.remove(other)
+    return crashed
+
+def groupcollide(groupa, groupb, dokilla, dokillb, collided=None, cell_size=CELL_SIZE, vectorized=False):
+    """Drop-in for pygame.sprite.groupcollide using a spatial hash of groupb.
+
+    Small groups and custom collided callbacks fall back to the pygame call.
+    With vectorized=True (and NumPy installed) the NumPy kernel is used instead.
+    """
+    if not groupa or not groupb:
+        return {}
+    if vectorized and np is not None and supports_broadphase(collided):
+        return vectorized_groupcollide(groupa, groupb, dokilla, dokillb, collided)
+    if len(groupa) * len(groupb) <= BRUTE_FORCE_PAIRS or not supports_broadphase(collided):
+        return pygame.sprite.groupcollide(groupa, groupb, dokilla, dokillb, collided)
+
+    grid = SpatialHash(cell_size, collided)
+    grid.build(groupb)
+
+    crashed = {}
+    for sprite in groupa.sprites():
+        if not grid:
+            break  # Every groupb sprite was killed
+        collision = spritecollide(sprite, groupb, dokillb, collided, grid)
+        if collision:
+            crashed[sprite] = collision
+            if dokilla:
+                sprite.kill()
+    return crashed
@@ -2,37 +2,256 @@ import pygame
 import random
 import os
 import sys
-from highscore import HighScoreManager, input_name_screen
+import math
+import time
+import collision
+import highscore
+from collections import deque
+from highscore import input_name_screen
+from text_cache import render_text
+from rotation_cache import rotation_cache
+from pool import PooledSprite, SpritePool
+from render import Renderer, brightness_filter
+from asset_manager import asset_manager, ASSETS_FOLDER, GAME_ASSETS_FOLDER
+from profiler import profiler
+import asteroid_field
+from asteroid_field import AsteroidField
 
 # -- Constants --
 HEIGHT = 700
 WIDTH = 1000
 PLAYER_HEIGHT = 70
 PLAYER_WIDTH = 70
+POWERUP_SIZE = (40, 40)
+HEALTH_ICON_SIZE = (30, 30)
+BULLET_POOL_SIZE = 64
+SMALL_PROJECTILE_POOL_SIZE = 96
+EXPLOSION_POOL_SIZE = 64
+MAX_EXPLOSIONS = 48  # Explosions playing at once; further ones are skipped
+ENERGY_CLEAR_MS = 2000  # How long an Energy powerup keeps clearing asteroids
+ENERGY_BATCH_SIZE = 12  # Asteroids the Energy wave destroys per frame
+ENERGY_SCREEN_EXPLOSIONS = 15  # Decorative explosions, one per frame at the start of the wave
+SPAWN_BUDGET = 3  # Queued replacement asteroids spawned per frame
+SHIELD_ALPHA = 128  # Ship transparency while shielded
+SCREEN_RECT = pygame.Rect(0, 0, WIDTH, HEIGHT)  # Sprites outside it are culled from drawing
+
+# Hard lifetime caps in simulation steps (60 per second); a sprite is
+# killed when it reaches its cap even if it never leaves the screen
+BULLET_LIFETIME = 120
+SMALL_PROJECTILE_LIFETIME = 120
+EXPLOSION_LIFETIME = 60
+POWERUP_LIFETIME = 600
+SIM_STEP_MS = 1000 / 60  # Simulation always advances in steps of this length
+MAX_STEPS_PER_FRAME = 5  # Steps run per rendered frame at most; older backlog is dropped
+MAX_INTERPOLATION_DISTANCE = 40  # Sprites that moved further in one step (respawned/recycled) are not blended
+PROFILE_FOLDER = "profiles"  # Frame dumps started with F4 are written here
+HUD_RATE_WINDOW_MS = 1000  # HUD rebuilds are reported per this much game time
 
 # -- Colours --
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 
+# -- Time & Input Sources --
+# Sprites take any object with get_ticks() as their clock and any object with
+# get_pressed() as their input source, so pygame.time and pygame.key work as-is
+# and headless runs can swap in the virtual versions below.
+class VirtualClock:
+    """Clock that only moves when advanced, for headless fixed-timestep runs"""
+    def __init__(self, step_ms=1000 / 60, start_ms=0):
+        self.step_ms = step_ms
+        self.time = start_ms
+
+    def get_ticks(self):
+        return int(self.time)
+
+    def advance(self, ms=None):
+        """Move time forward by ms (one fixed step by default)"""
+        self.time += self.step_ms if ms is None else ms
+
+class FrameClock:
+    """One timestamp per frame, read once from a source clock.
+
+    snapshot() samples the source (pygame.time or a VirtualClock) and
+    get_ticks() returns that value until the next snapshot, so every
+    timer and sprite in a frame sees the same time.
+    """
+    def __init__(self, source=pygame.time):
+        self.source = source
+        self.now = source.get_ticks()
+
+    def snapshot(self):
+        self.now = self.source.get_ticks()
+        return self.now
+
+    def get_ticks(self):
+        return self.now
+
+    def advance(self, ms=None):
+        """Advance a virtual source clock and take a new snapshot"""
+        self.source.advance(ms)
+        return self.snapshot()
+
+class FixedTimestep:
+    """Accumulator that turns real frame time into whole simulation steps.
+
+    add_time(ms) returns how many steps of step_ms to run this frame; the
+    remainder carries over and get_alpha() tells how far rendering is
+    between the last two steps. After a long stall at most max_steps are
+    run and the rest of the backlog is dropped, so the game slows down
+    briefly instead of spiralling.
+    """
+    def __init__(self, step_ms=SIM_STEP_MS, max_steps=MAX_STEPS_PER_FRAME):
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped_ms = 0.0  # Real time that was never simulated
+
+    def add_time(self, ms):
+        self.accumulator += ms
+        steps = int(self.accumulator // self.step_ms)
+        if steps > self.max_steps:
+            self.dropped_ms += (steps - self.max_steps) * self.step_ms
+            steps = self.max_steps
+        self.accumulator -= steps * self.step_ms
+        if self.accumulator >= self.step_ms:
+            self.accumulator %= self.step_ms
+        return steps
+
+    def get_alpha(self):
+        return self.accumulator / self.step_ms
+
+class KeyState:
+    """Indexable like pygame.key.get_pressed(), backed by a set of held keys"""
+    def __init__(self, held):
+        self.held = held
+
+    def __getitem__(self, key):
+        return key in self.held
+
+class ScriptedInput:
+    """Input source driven by code instead of the keyboard.
+
+    script is called once per frame with the frame number and returns
+    (held_keys, pressed_keys): keys held down for movement and keys
+    pressed this frame (delivered like KEYDOWN events).
+    """
+    def __init__(self, script=None):
+        self.script = script
+        self.frame = 0
+        self.held = frozenset()
+        self.pressed = []
+
+    def next_frame(self):
+        if self.script is not None:
+            held, pressed = self.script(self.frame)
+            self.held = frozenset(held)
+            self.pressed = list(pressed)
+        self.frame += 1
+
+    def get_pressed(self):
+        return KeyState(self.held)
+
+    def get_keydowns(self):
+        return self.pressed
+
+class BotInput(ScriptedInput):
+    """Simple bot: drifts in a randomly changing direction and fires constantly"""
+    def __init__(self, rng, turn_chance=0.03):
+        super().__init__()
+        self.rng = rng
+        self.turn_chance = turn_chance
+        self.move_key = pygame.K_LEFT
+
+    def next_frame(self):
+        if self.rng.random() < self.turn_chance:
+            self.move_key = self.rng.choice([pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN])
+        self.held = frozenset([self.move_key])
+        self.pressed = [pygame.K_SPACE]
+        self.frame += 1
+
 # -- Utility Function --
-def draw_text(surface, text, size, x, y, color=WHITE):
-    font = pygame.font.Font(None, size)
-    text_surface = font.render(text, True, color)
+def text_command(text, size, x, y, color=WHITE):
+    """Return a (surface, rect) draw command for text anchored at its midtop"""
+    text_surface = render_text(text, size, color)
     text_rect = text_surface.get_rect()
     text_rect.midtop = (x, y)
-    surface.blit(text_surface, text_rect)
+    return text_surface, text_rect
+
+def draw_text(surface, text, size, x, y, color=WHITE):
+    surface.blit(*text_command(text, size, x, y, color))
+
+# -- Ship Frame Variants --
+ship_variant_cache = {}  # (ship name, size) -> variant table
+
+def get_ship_frame_paths(game_assets_folder, ship_name):
+    """Paths of the 3 animation frames of a ship"""
+    ship_prefix = f"Player{ship_name}_Frame_"
+    return [os.path.join(game_assets_folder, f"{ship_prefix}{frame_num}_png_processed.png")
+            for frame_num in ['01', '02', '03']]
+
+def load_ship_frames(game_assets_folder, ship_name, size):
+    """Load and scale the 3 animation frames of a ship"""
+    frames = []
+    for img_path in get_ship_frame_paths(game_assets_folder, ship_name):
+        try:
+            frames.append(asset_manager.image(img_path, size))
+        except:
+            # Fallback to first frame if others don't exist
+            if len(frames) > 0:
+                frames.append(frames[0])
+    
+    if len(frames) == 0:
+        # Ultimate fallback
+        fallback = pygame.Surface(size)
+        fallback.fill((100, 100, 100))
+        frames.append(fallback)
+    return frames
+
+def build_ship_variants(frames):
+    """Precompute every (facing_right, shielded) version of a ship's frames.
+
+    Returns a dict mapping (facing_right, shielded) to a list of frames, so
+    drawing a ship needs no flip or alpha change at runtime.
+    """
+    variants = {}
+    for facing_right in (True, False):
+        if facing_right:
+            oriented = list(frames)
+        else:
+            oriented = [pygame.transform.flip(frame, True, False) for frame in frames]
+        variants[(facing_right, False)] = oriented
+
+        shielded = []
+        for frame in oriented:
+            # Tint a copy so the normal frame stays opaque
+            tinted = frame.copy()
+            tinted.set_alpha(SHIELD_ALPHA)
+            shielded.append(tinted)
+        variants[(facing_right, True)] = shielded
+    return variants
+
+def get_ship_variants(game_assets_folder, ship_name, size):
+    """Return the variant table for a ship, building it once per process"""
+    key = (ship_name, size)
+    if key not in ship_variant_cache:
+        frames = load_ship_frames(game_assets_folder, ship_name, size)
+        ship_variant_cache[key] = build_ship_variants(frames)
+    return ship_variant_cache[key]
 
 # -- Classes --
 class Player(pygame.sprite.Sprite):
-    def __init__(self, game_assets_folder):
+    def __init__(self, game_assets_folder, clock=pygame.time, input_source=pygame.key):
         super().__init__()
         self.game_assets_folder = game_assets_folder
+        self.clock = clock
+        self.input_source = input_source
         
         # Define available ship types
         self.ship_types = ['Blue', 'Red']
         self.current_ship_index = 0
         
         # Animation properties
+        self.ship_variants = {}
         self.animation_frames = []
         self.frame_index = 0
         self.frame_timer = 0
@@ -57,31 +276,19 @@ class Player(pygame.sprite.Sprite):
         # Load ship animations
         self.load_ship_animations()
         self.rect = self.image.get_rect(centerx=WIDTH / 2, bottom=HEIGHT - 10)
-        self.radius = 20
     
     def load_ship_animations(self):
         """Load animation frames for current ship"""
         current_ship = self.ship_types[self.current_ship_index]
-        ship_prefix = f"Player{current_ship}_Frame_"
-        
-        self.animation_frames = []
-        for frame_num in ['01', '02', '03']:
-            try:
-                img_path = os.path.join(self.game_assets_folder, f"{ship_prefix}{frame_num}_png_processed.png")
-                img = pygame.image.load(img_path).convert_alpha()
-                img = pygame.transform.scale(img, (PLAYER_WIDTH, PLAYER_HEIGHT))
-                self.animation_frames.append(img)
-            except:
-                # Fallback to first frame if others don't exist
-                if len(self.animation_frames) > 0:
-                    self.animation_frames.append(self.animation_frames[0])
-        
-        if len(self.animation_frames) > 0:
-            self.image = self.animation_frames[0]
-        else:
-            # Ultimate fallback
-            self.image = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT))
-            self.image.fill((100, 100, 100))
+        self.ship_variants = get_ship_variants(self.game_assets_folder, current_ship, (PLAYER_WIDTH, PLAYER_HEIGHT))
+        self.animation_frames = self.ship_variants[(True, False)]
+        self.frame_index = 0
+        self.image = self.animation_frames[0]
+        # Hits use the opaque frames' masks, also while the shield tints the ship
+        opaque_frames = self.ship_variants[(True, False)] + self.ship_variants[(False, False)]
+        collision.prebuild_masks(opaque_frames)
+        self.mask = collision.surface_masks[self.image]
+        self.radius = max(collision.get_surface_radius(frame) for frame in opaque_frames)
     
     def change_ship(self):
         """Change to the next ship type"""
@@ -104,15 +311,16 @@ class Player(pygame.sprite.Sprite):
     
     def can_shoot(self):
         """Check if player can shoot based on cooldown or ammo boost"""
-        now = pygame.time.get_ticks()
+        now = self.clock.get_ticks()
         if now < self.ammo_boost_end:  # Ammo boost active
             return True
         return now - self.last_shot >= self.shoot_cooldown
     
     def shoot(self):
         """Record that player has shot"""
-        if pygame.time.get_ticks() >= self.ammo_boost_end:  # Only record if not boosted
-            self.last_shot = pygame.time.get_ticks()
+        now = self.clock.get_ticks()
+        if now >= self.ammo_boost_end:  # Only record if not boosted
+            self.last_shot = now
     
     def take_damage(self):
         """Take damage if not shielded"""
@@ -127,19 +335,19 @@ class Player(pygame.sprite.Sprite):
     
     def activate_ammo_boost(self):
         """Activate ammo boost for 10 seconds"""
-        self.ammo_boost_end = pygame.time.get_ticks() + 10000
+        self.ammo_boost_end = self.clock.get_ticks() + 10000
     
     def activate_rocket_boost(self):
         """Activate rocket boost for 10 seconds"""
-        self.rocket_boost_end = pygame.time.get_ticks() + 10000
+        self.rocket_boost_end = self.clock.get_ticks() + 10000
     
     def activate_shield(self):
         """Activate shield for 10 seconds"""
-        self.shield_end = pygame.time.get_ticks() + 10000
+        self.shield_end = self.clock.get_ticks() + 10000
         self.is_shielded = True
         
-    def update(self):
-        keys = pygame.key.get_pressed()
+    def update(self, now=None):
+        keys = self.input_source.get_pressed()
         # Apply ship-specific speed bonus
         base_speed = 5
         ship_stats = self.get_ship_stats()
@@ -169,103 +377,113 @@ class Player(pygame.sprite.Sprite):
                 self.frame_timer = 0
                 self.frame_index = (self.frame_index + 1) % len(self.animation_frames)
         
-        # Apply current frame with direction
-        if len(self.animation_frames) > 0:
-            current_frame = self.animation_frames[self.frame_index]
-            if not self.facing_right:
-                self.image = pygame.transform.flip(current_frame, True, False)
-            else:
-                self.image = current_frame
-        
         # Update powerup timers
-        now = pygame.time.get_ticks()
+        if now is None:
+            now = self.clock.get_ticks()
         if now >= self.shield_end:
             self.is_shielded = False
         
-        # Apply shield visual effect
-        if self.is_shielded:
-            # Make ship semi-transparent when shielded
-            self.image.set_alpha(128)
+        # Apply current frame with direction (semi-transparent when shielded)
+        self.image = self.ship_variants[(self.facing_right, self.is_shielded)][self.frame_index]
+        self.mask = collision.surface_masks[self.ship_variants[(self.facing_right, False)][self.frame_index]]
 
 class Block(pygame.sprite.Sprite):
-    def __init__(self, image_list):
+    def __init__(self, image_list, clock=pygame.time, rng=random):
         super().__init__()
-        self.original_image = random.choice(image_list)
+        self.clock = clock
+        self.rng = rng
+        self.original_image = rng.choice(image_list)
         self.image = self.original_image
-        self.rect = self.image.get_rect(x=random.randrange(WIDTH - self.image.get_width()), y=random.randrange(-100, -40))
-        self.radius = int(self.rect.width * 0.85 / 2)
-        self.speed_y = random.randrange(2, 6)
-        self.speed_x = random.randrange(-2, 2)
+        self.rect = self.image.get_rect(x=rng.randrange(WIDTH - self.image.get_width()), y=rng.randrange(-100, -40))
+        self.mask, self.radius = rotation_cache.get_mask(self.original_image, 0)  # Tight radius of the pixels
+        self.speed_y = rng.randrange(2, 6)
+        self.speed_x = rng.randrange(-2, 2)
         self.rotation = 0
-        self.rotation_speed = random.randint(-5, 5)
-        self.last_update = pygame.time.get_ticks()
+        self.rotation_speed = rng.randint(-5, 5)
+        self.last_update = clock.get_ticks()
 
-    def rotate(self):
-        now = pygame.time.get_ticks()
+    def rotate(self, now):
         if now - self.last_update > 50:
             self.last_update = now
             self.rotation = (self.rotation + self.rotation_speed) % 360
-            new_image = pygame.transform.rotate(self.original_image, self.rotation)
+            new_image = rotation_cache.get_frame(self.original_image, self.rotation)
+            self.mask, self.radius = rotation_cache.get_mask(self.original_image, self.rotation)
             old_center = self.rect.center
             self.image = new_image
             self.rect = self.image.get_rect(center=old_center)
 
-    def update(self):
-        self.rotate()
+    def update(self, now=None):
+        self.rotate(self.clock.get_ticks() if now is None else now)
         self.rect.y += self.speed_y
         self.rect.x += self.speed_x
         if self.rect.top > HEIGHT + 10 or self.rect.left < -25 or self.rect.right > WIDTH + 20:
-            self.rect.x = random.randrange(WIDTH - self.rect.width)
-            self.rect.y = random.randrange(-100, -40)
-            self.speed_y = random.randrange(1, 8)
-            self.speed_x = random.randrange(-2, 2)  # Reset horizontal speed too
+            self.rect.x = self.rng.randrange(WIDTH - self.rect.width)
+            self.rect.y = self.rng.randrange(-100, -40)
+            self.speed_y = self.rng.randrange(1, 8)
+            self.speed_x = self.rng.randrange(-2, 2)  # Reset horizontal speed too
 
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, x, y, bullet_img):
-        super().__init__()
+class Bullet(PooledSprite):
+    def reset(self, x, y, bullet_img):
         self.image = bullet_img
-        self.rect = self.image.get_rect(centerx=x, bottom=y)
+        self.rect.size = bullet_img.get_size()
+        self.rect.centerx = x
+        self.rect.bottom = y
         self.speed_y = -10
+        self.age = 0
 
-    def update(self):
+    def update(self, now=None):
         self.rect.y += self.speed_y
-        if self.rect.bottom < 0:
+        self.age += 1
+        if self.rect.bottom < 0 or self.age >= BULLET_LIFETIME:
             self.kill()
 
-class SmallProjectile(pygame.sprite.Sprite):
-    def __init__(self, x, y, bullet_img, angle):
-        super().__init__()
-        # Make small projectile
-        small_img = pygame.transform.scale(bullet_img, (8, 16))
+class SmallProjectile(PooledSprite):
+    small_images = {}  # bullet image -> scaled copy, shared by all projectiles
+
+    def reset(self, x, y, bullet_img, angle):
+        # Make small projectile (scaled once per bullet image)
+        small_img = self.small_images.get(bullet_img)
+        if small_img is None:
+            small_img = pygame.transform.scale(bullet_img, (8, 16))
+            self.small_images[bullet_img] = small_img
+            collision.prebuild_masks([small_img])
         self.image = small_img
-        self.rect = self.image.get_rect(centerx=x, centery=y)
+        self.rect.size = small_img.get_size()
+        self.rect.center = (x, y)
         
         # Calculate velocity based on angle
-        import math
         speed = 8
         self.speed_x = math.cos(math.radians(angle)) * speed
         self.speed_y = math.sin(math.radians(angle)) * speed - 5  # Upward bias
+        self.age = 0
 
-    def update(self):
+    def update(self, now=None):
         self.rect.x += self.speed_x
         self.rect.y += self.speed_y
+        self.age += 1
         if (self.rect.bottom < 0 or self.rect.left < 0 or 
-            self.rect.right > WIDTH or self.rect.top > HEIGHT):
+            self.rect.right > WIDTH or self.rect.top > HEIGHT or self.age >= SMALL_PROJECTILE_LIFETIME):
             self.kill()
 
-class Explosion(pygame.sprite.Sprite):
-    def __init__(self, center, explosion_anim):
-        super().__init__()
+class Explosion(PooledSprite):
+    def reset(self, center, explosion_anim, clock=pygame.time):
+        self.clock = clock
         self.explosion_anim = explosion_anim
         self.image = self.explosion_anim[0]
-        self.rect = self.image.get_rect(center=center)
+        self.rect.size = self.image.get_size()
+        self.rect.center = center
         self.frame = 0
-        self.last_update = pygame.time.get_ticks()
+        self.last_update = clock.get_ticks()
         self.frame_rate = 50
+        self.age = 0
 
-    def update(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.frame_rate:
+    def update(self, now=None):
+        if now is None:
+            now = self.clock.get_ticks()
+        self.age += 1
+        if self.age >= EXPLOSION_LIFETIME:
+            self.kill()
+        elif now - self.last_update > self.frame_rate:
             self.last_update = now
             self.frame += 1
             if self.frame == len(self.explosion_anim):
@@ -273,7 +491,8 @@ class Explosion(pygame.sprite.Sprite):
             else:
                 center = self.rect.center
                 self.image = self.explosion_anim[self.frame]
-                self.rect = self.image.get_rect(center=center)
+                self.rect.size = self.image.get_size()
+                self.rect.center = center
 
 class Powerup(pygame.sprite.Sprite):
     def __init__(self, x, y, powerup_type, powerup_images):
@@ -282,15 +501,16 @@ class Powerup(pygame.sprite.Sprite):
         self.image = powerup_images[powerup_type]
         self.rect = self.image.get_rect(centerx=x, centery=y)
         self.speed_y = 2
-        self.radius = 20
+        self.radius = collision.get_surface_radius(self.image)  # Encloses every opaque pixel
         
         # Animation for floating effect
         self.float_offset = 0
         self.float_speed = 0.1
         self.float_direction = 1
         self.max_float = 10
+        self.age = 0
         
-    def update(self):
+    def update(self, now=None):
         # Move down
         self.rect.y += self.speed_y
         
@@ -299,223 +519,372 @@ class Powerup(pygame.sprite.Sprite):
         if self.float_offset >= self.max_float or self.float_offset <= -self.max_float:
             self.float_direction *= -1
             
-        # Remove if off screen
-        if self.rect.top > HEIGHT:
+        # Remove if off screen or too old
+        self.age += 1
+        if self.rect.top > HEIGHT or self.age >= POWERUP_LIFETIME:
             self.kill()
 
-# -- Main Game Loop --
-def game_loop(screen, clock, assets, selected_ship=0):
-    # Import menu settings
-    import menu
-    
-    # Initialize high score manager
-    highscore_manager = HighScoreManager()
-    
-    # Setup
-    game_assets_folder = os.path.join("Assets", "PixelSpaceRage", "256px")
-    all_sprites = pygame.sprite.Group()
-    enemies = pygame.sprite.Group()
-    bullets = pygame.sprite.Group()
-    small_projectiles = pygame.sprite.Group()
-    powerups = pygame.sprite.Group()
-    
-    player = Player(game_assets_folder)
-    player.current_ship_index = selected_ship  # Set the initial ship from menu
-    player.load_ship_animations()  # Reload the animations with the selected ship
-    all_sprites.add(player)
-    
-    # Load sound effects
-    try:
-        destroy_sound = pygame.mixer.Sound(os.path.join("Assets", "Destroyed.mp3"))
-    except:
-        destroy_sound = None
-    
-    # Load powerup images
-    powerup_images = {}
-    powerup_types = ['Ammo', 'Energy', 'Health', 'Rocket', 'Shield']
-    for ptype in powerup_types:
-        try:
+# -- HUD Layer --
+class HudLayer:
+    """The in-game HUD (score, health icons, powerup timers) as cached panels.
+
+    Each panel is composited into one surface. All panels are rebuilt
+    only when a value they show changes; timers count whole seconds, so
+    that happens about once per second. Every other frame reuses the
+    previous (surface, rect) commands, which also keeps them out of the
+    dirty-rect renderer's changed regions.
+    """
+
+    def __init__(self, health_icon):
+        self.health_icon = health_icon
+        self.key = None  # (score, health, timers) the panels were built for
+        self.commands = []
+        self.rebuilds = 0
+        self.rebuild_times = deque()  # Clock ticks of recent rebuilds
+
+    def get_commands(self, score, health, timers, now):
+        """Draw commands for the HUD; timers lists (label, seconds left) of active powerups"""
+        key = (score, health, timers)
+        if key != self.key:
+            self.key = key
+            self.commands = self.build(score, health, timers)
+            self.rebuilds += 1
+            self.rebuild_times.append(now)
+        rebuild_times = self.rebuild_times
+        while rebuild_times and now - rebuild_times[0] >= HUD_RATE_WINDOW_MS:
+            rebuild_times.popleft()
+        return self.commands
+
+    def build(self, score, health, timers):
+        commands = [text_command(f"Score: {score}", 30, WIDTH / 2, 10)]
+
+        # Health indicators
+        icons = [(self.health_icon, self.health_icon.get_rect(topleft=(WIDTH - 80 + (i * 35), HEIGHT - 45)))
+                 for i in range(health)]
+        if icons:
+            commands.append(composite(icons))
+
+        # Powerup timers, stacked upwards from the bottom
+        timer_y = HEIGHT - 40
+        texts = [text_command(f"{label}: {seconds}s", 20, 80, timer_y - 25 * row)
+                 for row, label, seconds in timers]
+        if texts:
+            commands.append(composite(texts))
+        return commands
+
+    def get_counts(self):
+        return {'rebuilds': self.rebuilds, 'per_s': len(self.rebuild_times)}
+
+def composite(commands):
+    """Blit non-overlapping (surface, rect) commands into one surface; returns its command"""
+    bounds = commands[0][1].unionall([rect for _, rect in commands[1:]])
+    layer = pygame.Surface(bounds.size, pygame.SRCALPHA)
+    layer.blits([(surface, rect.move(-bounds.x, -bounds.y)) for surface, rect in commands], doreturn=False)
+    return layer, bounds
+
+# -- Game Session --
+class GameSession:
+    """State and rules of one game, advanced one frame at a time.
+
+    The update half of the game lives in step() and never touches the
+    display, the mixer or the event queue, so it can run headless. Time,
+    keyboard and randomness come from the injected clock, input_source
+    and rng; the defaults are the real pygame ones. The clock is wrapped in
+    a FrameClock (self.clock) sampled once per step, and that time is passed
+    to every sprite update. With asteroid_field=True
+    asteroids live in a NumPy AsteroidField instead of Block sprites, and
+    with vectorized_collisions=True the sprite collision passes use the
+    NumPy kernels in collision. With interpolate=True every step keeps the
+    sprite centres from before it, so get_draw_commands(alpha) can draw
+    between two steps.
+    """
+
+    POWERUP_TYPES = ['Ammo', 'Energy', 'Health', 'Rocket', 'Shield']
+
+    def __init__(self, assets, selected_ship=0, clock=pygame.time, input_source=pygame.key,
+                 rng=None, highscore_manager=None, asteroid_field=False, vectorized_collisions=False,
+                 interpolate=False):
+        self.assets = assets
+        self.clock = clock = FrameClock(clock)
+        self.input_source = input_source
+        self.rng = rng if rng is not None else random.Random()
+        self.highscore_manager = highscore_manager
+        self.vectorized_collisions = vectorized_collisions
+        self.interpolate = interpolate
+        self.previous_centers = None  # sprite -> rect.center before the last step
+        self.draw_counts = {'drawn': 0, 'culled': 0}  # Sprites in the last get_draw_commands
+
+        # Setup
+        game_assets_folder = GAME_ASSETS_FOLDER
+        self.all_sprites = pygame.sprite.Group()
+        self.enemies = pygame.sprite.Group()
+        self.bullets = pygame.sprite.Group()
+        self.small_projectiles = pygame.sprite.Group()
+        self.powerups = pygame.sprite.Group()
+        self.field = AsteroidField(assets['meteor_images'], clock, self.rng) if asteroid_field else None
+
+        # Recycled short-lived sprites
+        self.bullet_pool = SpritePool(Bullet, BULLET_POOL_SIZE)
+        self.small_projectile_pool = SpritePool(SmallProjectile, SMALL_PROJECTILE_POOL_SIZE)
+        self.explosion_pool = SpritePool(Explosion, EXPLOSION_POOL_SIZE)
+
+        self.player = Player(game_assets_folder, clock, input_source)
+        self.player.current_ship_index = selected_ship  # Set the initial ship from menu
+        self.player.load_ship_animations()  # Reload the animations with the selected ship
+        self.all_sprites.add(self.player)
+
+        # Powerup images (fallback: yellow square)
+        self.powerup_images = {}
+        for ptype in self.POWERUP_TYPES:
             img_path = os.path.join(game_assets_folder, f"Powerup_{ptype}_png_processed.png")
-            img = pygame.image.load(img_path).convert_alpha()
-            img = pygame.transform.scale(img, (40, 40))
-            powerup_images[ptype] = img
-        except:
-            # Fallback powerup image
-            fallback = pygame.Surface((40, 40))
-            fallback.fill((255, 255, 0))  # Yellow square
-            powerup_images[ptype] = fallback
-    
-    # Load health icon (small ship image)
-    def load_health_icon():
-        current_ship = player.ship_types[player.current_ship_index]
-        try:
-            health_icon_path = os.path.join(game_assets_folder, f"Cover_{current_ship}_png_processed.png")
-            health_icon = pygame.image.load(health_icon_path).convert_alpha()
-            health_icon = pygame.transform.scale(health_icon, (30, 30))
-            return health_icon
-        except:
-            return None
-    
-    health_icon = load_health_icon()
-    
-    def spawn_new_block():
-        block = Block(assets['meteor_images'])
-        all_sprites.add(block)
-        enemies.add(block)
-    
-    def spawn_powerup():
-        if random.randint(1, 100) <= 15:  # 15% chance
-            ptype = random.choice(powerup_types)
-            x = random.randint(50, WIDTH - 50)
-            powerup = Powerup(x, -50, ptype, powerup_images)
-            all_sprites.add(powerup)
-            powerups.add(powerup)
-    
-    def create_screen_explosion():
-        """Create explosions across the screen for Energy powerup"""
-        for i in range(15):  # Multiple explosions
-            x = random.randint(50, WIDTH - 50)
-            y = random.randint(50, HEIGHT - 50)
-            expl = Explosion((x, y), assets['explosion_anim'])
-            all_sprites.add(expl)
-
-    for _ in range(8):
-        spawn_new_block()
-
-    score = 0
-    game_sub_state = "PLAYING" # "PLAYING", "PAUSED", "GAME_OVER", "HIGH_SCORE_INPUT"
-    last_powerup_spawn = 0
-    powerup_spawn_delay = 3000  # 3 seconds
-    energy_clear_end = 0
-    
-    # Asteroid spawn management
-    last_asteroid_spawn = 0
-    asteroid_spawn_delay = 2000  # 2 seconds
-    min_asteroids = 6  # Minimum number of asteroids on screen
-    
-    # High score management
-    high_score_processed = False
+            self.powerup_images[ptype] = asset_manager.image(img_path, POWERUP_SIZE, fallback_color=(255, 255, 0))
+        collision.prebuild_masks([assets['bullet_img']])
+        for image in self.powerup_images.values():
+            collision.get_surface_radius(image)  # Builds its mask too
 
-    pygame.mixer.music.load(assets['background_music'])
-    pygame.mixer.music.set_volume(0.4)
-    pygame.mixer.music.play(-1)
-    
-    running = True
-    while running:
-        clock.tick(60)
-        
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: return "QUIT"
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE: return "QUIT"
-                if game_sub_state == "PLAYING" and event.key == pygame.K_SPACE:
-                    # Check shooting cooldown
-                    if player.can_shoot():
-                        bullet = Bullet(player.rect.centerx, player.rect.top, assets['bullet_img'])
-                        all_sprites.add(bullet)
-                        bullets.add(bullet)
-                        player.shoot()  # Record the shot
-                if game_sub_state == "GAME_OVER" and event.key == pygame.K_r:
-                    return "PLAYING" # Kembali ke main.py untuk restart
-                if game_sub_state == "GAME_OVER" and event.key == pygame.K_x:
-                    return "MENU" # Kembali ke menu
-                if game_sub_state == "HIGH_SCORE_INPUT" and event.key == pygame.K_ESCAPE:
-                    game_sub_state = "GAME_OVER"  # Skip name input
-                if game_sub_state == "PLAYING" and event.key == pygame.K_p:
-                    game_sub_state = "PAUSED"
-                    pygame.mixer.music.pause()
-                elif game_sub_state == "PAUSED" and event.key == pygame.K_p:
-                    game_sub_state = "PLAYING"
-                    pygame.mixer.music.unpause()
+        # Health icon (small ship image, fallback: green square)
+        current_ship = self.player.ship_types[self.player.current_ship_index]
+        health_icon_path = os.path.join(game_assets_folder, f"Cover_{current_ship}_png_processed.png")
+        self.health_icon = asset_manager.image(health_icon_path, HEALTH_ICON_SIZE, fallback_color=(0, 255, 0))
+        self.hud = HudLayer(self.health_icon)
 
-        # Update
-        if game_sub_state == "HIGH_SCORE_INPUT" and not high_score_processed:
-            # Handle high score input
-            player_name = input_name_screen(screen, clock, score)
-            if player_name:
-                highscore_manager.add_score(player_name, score)
-            high_score_processed = True
-            game_sub_state = "GAME_OVER"
-        elif game_sub_state == "PLAYING":
-            all_sprites.update()
-            
+        for _ in range(8):
+            self.spawn_new_block()
+
+        self.score = 0
+        self.game_sub_state = "PLAYING" # "PLAYING", "PAUSED", "GAME_OVER", "HIGH_SCORE_INPUT"
+        self.frame = 0
+        self.last_powerup_spawn = 0
+        self.powerup_spawn_delay = 3000  # 3 seconds
+        self.powerup_chance = 15  # Percent chance that a powerup spawn actually drops one
+        self.energy_clear_end = 0
+        self.screen_explosions_left = 0
+        self.queued_spawns = 0  # Replacement asteroids waiting for the per-frame spawn budget
+
+        # Asteroid spawn management
+        self.last_asteroid_spawn = 0
+        self.asteroid_spawn_delay = 2000  # 2 seconds
+        self.min_asteroids = 6  # Minimum number of asteroids on screen
+
+    def spawn_new_block(self):
+        if self.field is not None:
+            self.field.spawn()
+            return
+        block = Block(self.assets['meteor_images'], self.clock, self.rng)
+        self.all_sprites.add(block)
+        self.enemies.add(block)
+
+    def spawn_powerup(self):
+        if self.rng.randint(1, 100) <= self.powerup_chance:
+            ptype = self.rng.choice(self.POWERUP_TYPES)
+            x = self.rng.randint(50, WIDTH - 50)
+            powerup = Powerup(x, -50, ptype, self.powerup_images)
+            self.all_sprites.add(powerup)
+            self.powerups.add(powerup)
+
+    def queue_spawn(self, count=1):
+        """Replace destroyed asteroids later, at most SPAWN_BUDGET per frame"""
+        self.queued_spawns += count
+
+    def spawn_queued(self):
+        count = min(self.queued_spawns, SPAWN_BUDGET)
+        for _ in range(count):
+            self.spawn_new_block()
+        self.queued_spawns -= count
+
+    def spawn_explosion(self, center, capped=True):
+        """Start an explosion; capped ones are skipped while MAX_EXPLOSIONS are playing"""
+        if capped and self.explosion_pool.in_use >= MAX_EXPLOSIONS:
+            return
+        expl = self.explosion_pool.acquire(center, self.assets['explosion_anim'], self.clock)
+        self.all_sprites.add(expl)
+
+    def create_screen_explosion(self, count=ENERGY_SCREEN_EXPLOSIONS):
+        """Create explosions at random places on the screen"""
+        for i in range(count):
+            x = self.rng.randint(50, WIDTH - 50)
+            y = self.rng.randint(50, HEIGHT - 50)
+            self.spawn_explosion((x, y))
+
+    # -- Energy Wave --
+    def start_energy_clear(self):
+        """Start the Energy powerup wave"""
+        self.energy_clear_end = self.clock.get_ticks() + ENERGY_CLEAR_MS
+        self.screen_explosions_left = ENERGY_SCREEN_EXPLOSIONS
+
+    def update_energy_clear(self):
+        """Destroy the next batch of asteroids for the Energy wave.
+
+        Replacements are queued and only spawned once the wave is over,
+        so each asteroid is destroyed (and scored) once instead of being
+        killed and respawned every frame.
+        """
+        if self.screen_explosions_left:
+            self.screen_explosions_left -= 1
+            self.create_screen_explosion(1)
+        if self.field is not None:
+            centers = self.field.pop(list(range(min(ENERGY_BATCH_SIZE, len(self.field)))))
+        else:
+            batch = self.enemies.sprites()[:ENERGY_BATCH_SIZE]
+            centers = [enemy.rect.center for enemy in batch]
+            for enemy in batch:
+                enemy.kill()
+        for center in centers:
+            self.spawn_explosion(center)
+            self.score += 25  # Bonus for energy clear
+        self.queue_spawn(len(centers))
+
+    def get_pool_stats(self):
+        """Get counters of the sprite pools, keyed by pool name"""
+        return {
+            'bullets': self.bullet_pool.get_stats(),
+            'small_projectiles': self.small_projectile_pool.get_stats(),
+            'explosions': self.explosion_pool.get_stats()
+        }
+
+    def get_sprite_counts(self):
+        """Number of sprites per group"""
+        return {
+            'all': len(self.all_sprites),
+            'enemies': self.get_asteroid_count(),
+            'bullets': len(self.bullets),
+            'small_projectiles': len(self.small_projectiles),
+            'powerups': len(self.powerups)
+        }
+
+    def get_asteroid_count(self):
+        return len(self.field) if self.field is not None else len(self.enemies)
+
+    def get_profile_counts(self):
+        """Counters shown by the profiler overlay and written to its dumps"""
+        counts = {'sprites': self.get_sprite_counts()}
+        # One group per pool: hits, misses, discarded, in_use, free, high_water
+        counts.update((f"pool_{name}", stats) for name, stats in self.get_pool_stats().items())
+        counts.update({
+            'queued_spawns': self.queued_spawns,
+            'draw': self.draw_counts,
+            'hud': self.hud.get_counts()
+        })
+        return counts
+
+    def handle_key(self, key):
+        """React to a key press (KEYDOWN) during the game"""
+        player = self.player
+        if self.game_sub_state == "PLAYING" and key == pygame.K_SPACE:
+            # Check shooting cooldown
+            if player.can_shoot():
+                bullet = self.bullet_pool.acquire(player.rect.centerx, player.rect.top, self.assets['bullet_img'])
+                self.all_sprites.add(bullet)
+                self.bullets.add(bullet)
+                player.shoot()  # Record the shot
+        if self.game_sub_state == "PLAYING" and key == pygame.K_p:
+            self.game_sub_state = "PAUSED"
+        elif self.game_sub_state == "PAUSED" and key == pygame.K_p:
+            self.game_sub_state = "PLAYING"
+
+    def step(self):
+        """Advance the simulation by one frame"""
+        self.frame += 1
+        if self.interpolate:
+            self.previous_centers = {sprite: sprite.rect.center for sprite in self.all_sprites}
+        now = self.clock.snapshot()
+        if self.game_sub_state == "PLAYING":
+            self.update_playing(now)
+        elif self.game_sub_state == "GAME_OVER":
+            with profiler.scope('update'):
+                self.all_sprites.update(now) # Hanya update ledakan dll
+
+    def update_playing(self, now):
+        player = self.player
+        enemies = self.enemies
+        with profiler.scope('update'):
+            self.all_sprites.update(now)
+            if self.field is not None:
+                self.field.update(now)
+
+        with profiler.scope('spawn'):
             # Spawn powerups occasionally
-            now = pygame.time.get_ticks()
-            if now - last_powerup_spawn > powerup_spawn_delay:
-                spawn_powerup()
-                last_powerup_spawn = now
-            
+            if now - self.last_powerup_spawn > self.powerup_spawn_delay:
+                self.spawn_powerup()
+                self.last_powerup_spawn = now
+
             # Maintain minimum asteroids
-            if now - last_asteroid_spawn > asteroid_spawn_delay:
-                current_asteroid_count = len(enemies)
-                if current_asteroid_count < min_asteroids:
-                    spawn_new_block()
-                    last_asteroid_spawn = now
-            
-            # Energy powerup effect - clear enemies
-            if now < energy_clear_end:
-                for enemy in enemies:
-                    expl = Explosion(enemy.rect.center, assets['explosion_anim'])
-                    all_sprites.add(expl)
-                    score += 25  # Bonus for energy clear
-                    enemy.kill()
-                    spawn_new_block()
-                
-            # Enemy-Bullet collisions
-            hits = pygame.sprite.groupcollide(enemies, bullets, True, True)
-            for hit in hits:
-                score += 50
-                hit_pos = hit.rect.center
-                expl = Explosion(hit_pos, assets['explosion_anim'])
-                all_sprites.add(expl)
-                spawn_new_block()
-                
+            if now - self.last_asteroid_spawn > self.asteroid_spawn_delay:
+                current_asteroid_count = self.get_asteroid_count() + self.queued_spawns
+                if current_asteroid_count < self.min_asteroids:
+                    self.spawn_new_block()
+                    self.last_asteroid_spawn = now
+
+            # Energy powerup effect - clear enemies in batches, then refill
+            if now < self.energy_clear_end:
+                self.update_energy_clear()
+            elif self.queued_spawns:
+                self.spawn_queued()
+
+        # Enemy-Bullet collisions
+        with profiler.scope('collide_bullets'):
+            if self.field is not None:
+                hit_centers = self.field.collide_group(self.bullets)
+            else:
+                hit_centers = [hit.rect.center for hit in collision.groupcollide(
+                    enemies, self.bullets, True, True, collision.collide_rect_mask,
+                    vectorized=self.vectorized_collisions)]
+            for hit_pos in hit_centers:
+                self.score += 50
+                self.spawn_explosion(hit_pos)
+                self.queue_spawn()
+
                 # Rocket powerup effect - create small projectiles
                 if now < player.rocket_boost_end:
                     for angle in [225, 270, 315]:  # Left-up, up, right-up
-                        small_proj = SmallProjectile(hit_pos[0], hit_pos[1], assets['bullet_img'], angle)
-                        all_sprites.add(small_proj)
-                        small_projectiles.add(small_proj)
-            
-            # Small projectile-Enemy collisions
-            small_hits = pygame.sprite.groupcollide(enemies, small_projectiles, True, True)
-            for hit in small_hits:
-                score += 25
-                expl = Explosion(hit.rect.center, assets['explosion_anim'])
-                all_sprites.add(expl)
-                spawn_new_block()
-            
-            # Player-Enemy collisions
-            hits = pygame.sprite.spritecollide(player, enemies, True, pygame.sprite.collide_circle)
+                        small_proj = self.small_projectile_pool.acquire(hit_pos[0], hit_pos[1], self.assets['bullet_img'], angle)
+                        self.all_sprites.add(small_proj)
+                        self.small_projectiles.add(small_proj)
+
+        # Small projectile-Enemy collisions
+        with profiler.scope('collide_small'):
+            if self.field is not None:
+                small_hit_centers = self.field.collide_group(self.small_projectiles)
+            else:
+                small_hit_centers = [hit.rect.center for hit in collision.groupcollide(
+                    enemies, self.small_projectiles, True, True, collision.collide_rect_mask,
+                    vectorized=self.vectorized_collisions)]
+            for hit_pos in small_hit_centers:
+                self.score += 25
+                self.spawn_explosion(hit_pos)
+                self.queue_spawn()
+
+        # Player-Enemy collisions
+        with profiler.scope('collide_player'):
+            if self.field is not None:
+                hits = self.field.collide_circle(player)
+            else:
+                hits = collision.spritecollide(player, enemies, True, collision.collide_circle_mask,
+                                               vectorized=self.vectorized_collisions)
             if hits:
                 if player.take_damage():  # Check if player dies
-                    if destroy_sound:
-                        destroy_sound.play()
-                    player_expl = Explosion(player.rect.center, assets['explosion_anim'])
-                    all_sprites.add(player_expl)
+                    self.spawn_explosion(player.rect.center, capped=False)
                     player.kill()
-                    pygame.mixer.music.stop()
-                    
+
                     # Check if it's a high score
-                    if highscore_manager.is_high_score(score):
-                        game_sub_state = "HIGH_SCORE_INPUT"
+                    if self.highscore_manager and self.highscore_manager.is_high_score(self.score):
+                        self.game_sub_state = "HIGH_SCORE_INPUT"
                     else:
-                        game_sub_state = "GAME_OVER"
-            
-            # Player-Powerup collisions
-            powerup_hits = pygame.sprite.spritecollide(player, powerups, True, pygame.sprite.collide_circle)
+                        self.game_sub_state = "GAME_OVER"
+
+        # Player-Powerup collisions
+        with profiler.scope('collide_powerups'):
+            powerup_hits = collision.spritecollide(player, self.powerups, True, collision.collide_circle_mask,
+                                                   vectorized=self.vectorized_collisions)
             for powerup in powerup_hits:
-                score += 25  # Bonus points for collecting powerup
-                expl = Explosion(powerup.rect.center, assets['explosion_anim'])
-                all_sprites.add(expl)
-                
+                self.score += 25  # Bonus points for collecting powerup
+                self.spawn_explosion(powerup.rect.center)
+
                 # Apply powerup effects
                 if powerup.powerup_type == 'Ammo':
                     player.activate_ammo_boost()
                 elif powerup.powerup_type == 'Energy':
-                    energy_clear_end = now + 2000  # 2 seconds
-                    create_screen_explosion()
+                    self.start_energy_clear()
                 elif powerup.powerup_type == 'Health':
                     player.heal()
                 elif powerup.powerup_type == 'Rocket':
@@ -523,56 +892,199 @@ def game_loop(screen, clock, assets, selected_ship=0):
                 elif powerup.powerup_type == 'Shield':
                     player.activate_shield()
 
-        elif game_sub_state == "GAME_OVER":
-            all_sprites.update() # Hanya update ledakan dll
+    def get_draw_commands(self, alpha=None):
+        """Return (surface, rect) commands for all sprites, in draw order.
 
-        # Draw
-        screen.fill(BLACK)
-        all_sprites.draw(screen)
-        draw_text(screen, f"Score: {score}", 30, WIDTH / 2, 10)
-        
-        # Draw health indicators
-        for i in range(player.health):
-            health_x = WIDTH - 80 + (i * 35)
-            health_y = HEIGHT - 45
-            if health_icon:
-                screen.blit(health_icon, (health_x, health_y))
-            else:
-                # Fallback to rectangle if image fails to load
-                health_icon_rect = pygame.Rect(health_x, health_y, 30, 30)
-                pygame.draw.rect(screen, (0, 255, 0), health_icon_rect)
-        
-        # Draw powerup timers
-        timer_y = HEIGHT - 40
+        With alpha (0.0 to 1.0, from FixedTimestep.get_alpha) sprites are
+        drawn that far between their places before and after the last step.
+        Sprites entirely outside SCREEN_RECT are culled; draw_counts keeps
+        how many were drawn and culled.
+        """
+        sprites = self.all_sprites.sprites()
+        if alpha is None or self.previous_centers is None:
+            lag = 0.0
+            rects = [sprite.rect for sprite in sprites]
+        else:
+            lag = 1.0 - alpha  # How far back from the current positions to draw, in steps
+            previous_centers = self.previous_centers
+            rects = []
+            for sprite in sprites:
+                rect = sprite.rect
+                previous = previous_centers.get(sprite)
+                if previous is not None:
+                    dx = rect.centerx - previous[0]
+                    dy = rect.centery - previous[1]
+                    if (dx or dy) and abs(dx) + abs(dy) <= MAX_INTERPOLATION_DISTANCE:
+                        rect = rect.move(-round(dx * lag), -round(dy * lag))
+                rects.append(rect)
+
+        commands = self.field.get_draw_commands(lag, SCREEN_RECT) if self.field is not None else []
+        commands += [(sprites[index].image, rects[index]) for index in SCREEN_RECT.collidelistall(rects)]
+        total = len(sprites) + (len(self.field) if self.field is not None else 0)
+        self.draw_counts = {'drawn': len(commands), 'culled': total - len(commands)}
+        return commands
+
+    def get_hud_commands(self):
+        """Return (surface, rect) commands for the HUD (score, health, powerup timers)"""
+        player = self.player
+        now = self.clock.get_ticks()
+
+        # Powerup timers as (row, label, whole seconds left)
+        timers = []
         if player.is_shielded:
-            shield_time = max(0, (player.shield_end - pygame.time.get_ticks()) // 1000)
-            draw_text(screen, f"Shield: {shield_time}s", 20, 80, timer_y)
-        
-        if pygame.time.get_ticks() < player.ammo_boost_end:
-            ammo_time = max(0, (player.ammo_boost_end - pygame.time.get_ticks()) // 1000)
-            draw_text(screen, f"Ammo: {ammo_time}s", 20, 80, timer_y - 25)
-            
-        if pygame.time.get_ticks() < player.rocket_boost_end:
-            rocket_time = max(0, (player.rocket_boost_end - pygame.time.get_ticks()) // 1000)
-            draw_text(screen, f"Rocket: {rocket_time}s", 20, 80, timer_y - 50)
+            timers.append((0, "Shield", int(max(0, (player.shield_end - now) // 1000))))
+        if now < player.ammo_boost_end:
+            timers.append((1, "Ammo", int(max(0, (player.ammo_boost_end - now) // 1000))))
+        if now < player.rocket_boost_end:
+            timers.append((2, "Rocket", int(max(0, (player.rocket_boost_end - now) // 1000))))
+        return self.hud.get_commands(self.score, player.health, tuple(timers), now)
+
+    def get_state_commands(self):
+        """Return (surface, rect) commands for the pause / game over text"""
+        if self.game_sub_state == "PAUSED":
+            return [
+                text_command("Game Paused", 48, WIDTH / 2, HEIGHT / 2 - 50),
+                text_command("Press P to Continue", 22, WIDTH / 2, HEIGHT / 2)
+            ]
+        if self.game_sub_state == "GAME_OVER":
+            return [
+                text_command("GAME OVER!", 64, WIDTH / 2, HEIGHT / 4),
+                text_command(f"Final Score: {self.score}", 30, WIDTH / 2, HEIGHT / 2 - 50),
+                text_command("Press R to restart the game", 30, WIDTH / 2, HEIGHT / 2),
+                text_command("Press X to exit to main menu", 22, WIDTH / 2, HEIGHT / 2 + 50)
+            ]
+        # HIGH_SCORE_INPUT is drawn by input_name_screen
+        return []
+
+    def draw(self, screen):
+        """Draw sprites and HUD (score, health, powerup timers)"""
+        screen.fill(BLACK)
+        screen.blits(self.get_draw_commands(), doreturn=False)
+        screen.blits(self.get_hud_commands(), doreturn=False)
+
+# -- Main Game Loop --
+def toggle_profile_dump():
+    """Start (and switch on the profiler) or stop dumping frame timings to CSV"""
+    if profiler.is_dumping():
+        profiler.stop_dump()
+        return
+    os.makedirs(PROFILE_FOLDER, exist_ok=True)
+    path = os.path.join(PROFILE_FOLDER, time.strftime("frames_%Y%m%d_%H%M%S.csv"))
+    profiler.set_enabled(True)
+    profiler.start_dump(path)
+
+def game_loop(screen, clock, assets, selected_ship=0, highscore_manager=None):
+    # Import menu settings and the replay recorder
+    import menu
+    import replay
+    
+    # Shared high score manager unless the caller passes its own
+    if highscore_manager is None:
+        highscore_manager = highscore.highscore_manager
+    use_field = menu.settings['asteroid_field'] and asteroid_field.is_available()
+    use_kernels = menu.settings['vector_collisions'] and collision.is_vectorized_available()
+
+    # The simulation runs on its own clock in fixed steps; rendering
+    # interpolates between the last two steps
+    start_ms = pygame.time.get_ticks()
+    sim_clock = VirtualClock(SIM_STEP_MS, start_ms)
+    timestep = FixedTimestep()
+
+    # Seeded RNG and per-step input masks, so every game can be replayed
+    seed = random.randrange(1 << 32)
+    input_source = replay.ReplayInput()
+    recorder = replay.ReplayRecorder(seed, start_ms, SIM_STEP_MS, selected_ship, assets['meteor_sizes'],
+                                     use_field, use_kernels)
+    pending_presses = set()  # SPACE / P pressed since the last step
+    session = GameSession(assets, selected_ship, sim_clock, input_source, random.Random(seed),
+                          highscore_manager=highscore_manager, asteroid_field=use_field,
+                          vectorized_collisions=use_kernels, interpolate=True)
+
+    def finish(result):
+        recorder.save(session.score)  # Written on a worker thread
+        return result
+    
+    # Sound effects (loaded once per process)
+    destroy_sound = asset_manager.sound(os.path.join(ASSETS_FOLDER, "Destroyed.mp3"))
+    
+    # High score management
+    high_score_processed = False
+
+    # Rendering
+    renderer = Renderer(screen, menu.settings['dirty_rendering'])
+
+    asset_manager.load_music(assets['background_music'])
+    pygame.mixer.music.set_volume(0.4)
+    pygame.mixer.music.play(-1)
+    
+    running = True
+    while running:
+        elapsed_ms = clock.tick(menu.settings['max_fps'])
+        profiler.begin_frame()
+        previous_state = session.game_sub_state
         
-        # Apply brightness overlay
-        if menu.settings['brightness'] < 1.0:
-            overlay = pygame.Surface((WIDTH, HEIGHT))
-            overlay.fill(BLACK)
-            overlay.set_alpha(int((1.0 - menu.settings['brightness']) * 255))
-            screen.blit(overlay, (0, 0))
+        # Event handling
+        with profiler.scope('events'):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT: return finish("QUIT")
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE: return finish("QUIT")
+                    if session.game_sub_state == "GAME_OVER" and event.key == pygame.K_r:
+                        return finish("PLAYING") # Kembali ke main.py untuk restart
+                    if session.game_sub_state == "GAME_OVER" and event.key == pygame.K_x:
+                        return finish("MENU") # Kembali ke menu
+                    if event.key == pygame.K_F3:
+                        # Profiler overlay on/off
+                        profiler.set_enabled(not profiler.enabled)
+                    elif event.key == pygame.K_F4:
+                        toggle_profile_dump()
+                    elif event.key in replay.RECORDED_PRESSES:
+                        pending_presses.add(event.key)  # Delivered with the next step
+
+        # Update
+        if session.game_sub_state == "HIGH_SCORE_INPUT" and not high_score_processed:
+            # Handle high score input
+            player_name = input_name_screen(screen, clock, session.score)
+            if player_name:
+                highscore_manager.add_score(player_name, session.score)
+            high_score_processed = True
+            session.game_sub_state = "GAME_OVER"
+            renderer.invalidate()  # The name input screen drew over the game
+        else:
+            keys = pygame.key.get_pressed()
+            for _ in range(timestep.add_time(elapsed_ms)):
+                input_source.set_mask(replay.encode_input(keys, pending_presses))
+                pending_presses.clear()
+                recorder.record(input_source.mask)
+                for key in input_source.get_keydowns():
+                    session.handle_key(key)
+                session.step()
+                session.clock.advance()
+
+        # Audio follows state changes made by the simulation
+        if session.game_sub_state != previous_state:
+            if session.game_sub_state == "PAUSED":
+                pygame.mixer.music.pause()
+            elif previous_state == "PAUSED":
+                pygame.mixer.music.unpause()
+            elif previous_state == "PLAYING":
+                # Player died
+                if destroy_sound:
+                    destroy_sound.play()
+                pygame.mixer.music.stop()
+
+        # Draw
+        with profiler.scope('draw_commands'):
+            commands = session.get_draw_commands(timestep.get_alpha())
+        with profiler.scope('hud'):
+            commands += session.get_hud_commands()
+            top_commands = session.get_state_commands()
         
-        if game_sub_state == "PAUSED":
-            draw_text(screen, "Game Paused", 48, WIDTH / 2, HEIGHT / 2 - 50)
-            draw_text(screen, "Press P to Continue", 22, WIDTH / 2, HEIGHT / 2)
-        elif game_sub_state == "HIGH_SCORE_INPUT":
-            # This state is handled in the update section with input_name_screen
-            pass
-        elif game_sub_state == "GAME_OVER":
-            draw_text(screen, "GAME OVER!", 64, WIDTH / 2, HEIGHT / 4)
-            draw_text(screen, f"Final Score: {score}", 30, WIDTH / 2, HEIGHT / 2 - 50)
-            draw_text(screen, "Press R to restart the game", 30, WIDTH / 2, HEIGHT / 2)
-            draw_text(screen, "Press X to exit to main menu", 22, WIDTH / 2, HEIGHT / 2 + 50)
-
-        pygame.display.flip()
+        # Brightness is applied as a post-process stage
+        brightness_filter.set_brightness(menu.settings['brightness'])
+        post_process = brightness_filter if brightness_filter.is_active() else None
+
+        if profiler.enabled:
+            top_commands += profiler.get_overlay_commands()
+        renderer.render(commands, post_process, top_commands)
+        profiler.end_frame(session.get_profile_counts())
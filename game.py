@@ -4,60 +4,126 @@ import os
 import random
 import core  # Diubah dari 'import game' menjadi 'import core'
 import menu
-from highscore import HighScoreManager, show_highscores
+from rotation_cache import rotation_cache
+from asset_manager import asset_manager, ASSETS_FOLDER, GAME_ASSETS_FOLDER
+from asset_pack import load_pack
+from highscore import highscore_manager, show_highscores
 
-# -- Main Function --
-def main():
-    pygame.init()
-    pygame.mixer.init()
+# -- Constants --
+SHIP_NAMES = ['Blue', 'Red']
+BULLET_SIZE = (15, 35)
+EXPLOSION_SIZE = (80, 80)
+# Frame sets shipped with the art pack that the game does not draw yet
+UNUSED_FRAME_SETS = ['Exhaust', 'Enemy01_Green', 'Enemy01_Red', 'Enemy01_Teal',
+                     'Enemy02Green', 'Enemy02Red', 'Enemy02_Teal']
 
-    # -- Constants --
-    HEIGHT = 700
-    WIDTH = 1000
-    
-    # Setup layar
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Space Shooter")
-    clock = pygame.time.Clock()
+# -- Asset Loading --
+def get_meteor_paths():
+    """Asteroid image files, in a stable order"""
+    meteor_folder = os.path.join(GAME_ASSETS_FOLDER, "Asteroid")
+    return [os.path.join(meteor_folder, file) for file in sorted(os.listdir(meteor_folder)) if file.endswith(".png")]
+
+def get_frame_sets(include_unused=False):
+    """Sprite images grouped by frame set, as (path, size) keys for asset_manager.image.
 
-    # -- Asset Paths --
-    assets_folder = "Assets"
-    game_assets_folder = os.path.join(assets_folder, "PixelSpaceRage", "256px")
+    Asteroids are not listed because their size is picked at load time.
+    Unused sets are listed at their native size (None).
+    """
+    player_size = (core.PLAYER_WIDTH, core.PLAYER_HEIGHT)
+    frame_sets = {}
+    for ship_name in SHIP_NAMES:
+        paths = core.get_ship_frame_paths(GAME_ASSETS_FOLDER, ship_name)
+        frame_sets[f'Player{ship_name}'] = ([(path, player_size) for path in paths] +
+                                            [(path, menu.SHIP_PREVIEW_SIZE) for path in paths])
+    frame_sets['Explosion02'] = [(os.path.join(GAME_ASSETS_FOLDER, f'Explosion02_Frame_0{i}_png_processed.png'), EXPLOSION_SIZE)
+                                 for i in range(1, 10)]
+    frame_sets['Powerup'] = [(os.path.join(GAME_ASSETS_FOLDER, f"Powerup_{ptype}_png_processed.png"), core.POWERUP_SIZE)
+                             for ptype in core.GameSession.POWERUP_TYPES]
+    frame_sets['Cover'] = [(os.path.join(GAME_ASSETS_FOLDER, f"Cover_{ship_name}_png_processed.png"), core.HEALTH_ICON_SIZE)
+                           for ship_name in SHIP_NAMES]
+    frame_sets['Laser'] = [(os.path.join(GAME_ASSETS_FOLDER, "Laser_Small_png_processed.png"), BULLET_SIZE)]
+    if include_unused:
+        files = sorted(os.listdir(GAME_ASSETS_FOLDER))
+        for prefix in UNUSED_FRAME_SETS:
+            frame_sets[prefix] = [(os.path.join(GAME_ASSETS_FOLDER, file), None)
+                                  for file in files if file.startswith(f"{prefix}_Frame_")]
+    return frame_sets
 
-    # -- Load Assets --
+def get_image_manifest():
+    """Every image file the game uses, in the order the screens need them"""
+    frame_sets = get_frame_sets()
+    # Menu ship preview and in-game ship first
+    ship_keys = [key for ship_name in SHIP_NAMES for key in frame_sets.pop(f'Player{ship_name}')]
+    paths = [path for path, _ in ship_keys] + get_meteor_paths()
+    paths += [path for frame_set in frame_sets.values() for path, _ in frame_set]
+    return list(dict.fromkeys(paths))
+
+def load_assets(rng=random, meteor_sizes=None):
+    """Load meteor, bullet and explosion images (needs a display for convert_alpha).
+
+    Meteor sizes are drawn from rng unless meteor_sizes (e.g. from a
+    replay) gives them.
+    """
     assets = {
         'meteor_images': [],
+        'meteor_sizes': [],
         'bullet_img': None,
         'explosion_anim': [],
-        'background_music': os.path.join(assets_folder, "Background Music.mp3")
+        'atlas': None,
+        'background_music': os.path.join(ASSETS_FOLDER, "Background Music.mp3")
     }
 
     # Memuat gambar-gambar meteor
-    meteor_folder = os.path.join(game_assets_folder, "Asteroid")
-    for file in os.listdir(meteor_folder):
-        if file.endswith(".png"):
-            img_path = os.path.join(meteor_folder, file)
-            img = pygame.image.load(img_path).convert_alpha()
-            img = pygame.transform.scale(img, (random.randint(40, 70), random.randint(40, 70)))
-            assets['meteor_images'].append(img)
+    if meteor_sizes is None:
+        meteor_sizes = [(rng.randint(40, 70), rng.randint(40, 70)) for _ in get_meteor_paths()]
+    assets['meteor_sizes'] = [tuple(size) for size in meteor_sizes]
+    meteor_keys = list(zip(get_meteor_paths(), assets['meteor_sizes']))
+
+    # Pack every sprite frame into one atlas; the images below are served from it
+    atlas_keys = meteor_keys + [key for frame_set in get_frame_sets().values() for key in frame_set]
+    assets['atlas'] = asset_manager.build_atlas(atlas_keys)
+
+    assets['meteor_images'] = [asset_manager.image(*key) for key in meteor_keys]
+    rotation_cache.prebuild(assets['meteor_images'])  # Bake rotation frames once
 
     # Memuat gambar peluru
-    bullet_img_path = os.path.join(game_assets_folder, "Laser_Small_png_processed.png")
-    assets['bullet_img'] = pygame.image.load(bullet_img_path).convert_alpha()
-    assets['bullet_img'] = pygame.transform.scale(assets['bullet_img'], (15, 35))
+    bullet_img_path = os.path.join(GAME_ASSETS_FOLDER, "Laser_Small_png_processed.png")
+    assets['bullet_img'] = asset_manager.image(bullet_img_path, BULLET_SIZE)
 
     # Memuat gambar-gambar untuk animasi ledakan
     for i in range(1, 10):
         filename = f'Explosion02_Frame_0{i}_png_processed.png'
-        img_path = os.path.join(game_assets_folder, filename)
-        img = pygame.image.load(img_path).convert_alpha()
-        img = pygame.transform.scale(img, (80, 80))
-        assets['explosion_anim'].append(img)
+        img_path = os.path.join(GAME_ASSETS_FOLDER, filename)
+        assets['explosion_anim'].append(asset_manager.image(img_path, EXPLOSION_SIZE))
+
+    return assets
+
+# -- Main Function --
+def main():
+    pygame.init()
+    pygame.mixer.init()
+
+    # -- Constants --
+    HEIGHT = 700
+    WIDTH = 1000
+    
+    # Setup layar
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Space Shooter")
+    clock = pygame.time.Clock()
+
+    # Cooked images come from the asset pack; the rest are decoded on
+    # worker threads while the loading screen is shown
+    asset_manager.set_pack(load_pack())
+    load_job = asset_manager.preload(get_image_manifest())
+    if menu.loading_screen(screen, clock, load_job) == "QUIT":
+        pygame.quit()
+        sys.exit()
+    assets = load_assets()
 
     # -- Game State Machine --
     game_state = "MENU"
     selected_ship = 0  # Default ship selection
-    highscore_manager = HighScoreManager()  # Initialize high score manager
     
     while True:
         if game_state == "MENU":
@@ -80,11 +146,12 @@ def main():
                 game_state = "MENU"
         elif game_state == "PLAYING":
             # Diubah dari 'game.game_loop' menjadi 'core.game_loop'
-            game_state = core.game_loop(screen, clock, assets, selected_ship)
+            game_state = core.game_loop(screen, clock, assets, selected_ship, highscore_manager)
         
         if game_state == "QUIT":
             break
             
+    highscore_manager.close()  # Finish pending high score writes
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,106 @@
+"""Headless fixed-timestep simulation of the game, without a window or audio.
+
+Usage:
+    python headless.py [--frames N] [--seed S] [--ship 0|1] [--render] [--profile out.csv|out.jsonl] [--field] [--kernels]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import random
+import time
+import pygame
+import core
+import game
+from profiler import profiler
+
+# -- Constants --
+HEIGHT = 700
+WIDTH = 1000
+STEP_MS = 1000 / 60  # One simulated frame at 60 FPS
+
+# -- Setup --
+def init_headless():
+    """Create a hidden display so images can be loaded and converted"""
+    pygame.init()
+    return pygame.display.set_mode((WIDTH, HEIGHT))
+
+def create_session(assets, seed, selected_ship=0, input_source=None, asteroid_field=False,
+                   vectorized_collisions=False, start_ms=0, step_ms=STEP_MS):
+    """Build a GameSession driven by a virtual clock and a seeded RNG"""
+    rng = random.Random(seed)
+    clock = core.VirtualClock(step_ms, start_ms)
+    if input_source is None:
+        input_source = core.BotInput(random.Random(seed + 1))
+    session = core.GameSession(assets, selected_ship, clock=clock, input_source=input_source, rng=rng,
+                               asteroid_field=asteroid_field, vectorized_collisions=vectorized_collisions)
+    return session
+
+# -- Simulation --
+def run(assets, frames=3600, seed=0, selected_ship=0, input_source=None, screen=None,
+        stop_on_game_over=False, asteroid_field=False, vectorized_collisions=False, start_ms=0, step_ms=STEP_MS):
+    """Simulate up to frames steps and return a summary dict.
+
+    Time only advances by step_ms per step, so results depend on the seed
+    and input alone. Pass a screen to also render every frame.
+    """
+    session = create_session(assets, seed, selected_ship, input_source, asteroid_field, vectorized_collisions,
+                             start_ms, step_ms)
+    input_source = session.input_source
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        profiler.begin_frame()
+        input_source.next_frame()
+        for key in input_source.get_keydowns():
+            session.handle_key(key)
+        session.step()
+        if screen is not None:
+            with profiler.scope('draw'):
+                session.draw(screen)
+        session.clock.advance()
+        profiler.end_frame(session.get_profile_counts())
+        if stop_on_game_over and session.game_sub_state != "PLAYING":
+            break
+    elapsed = time.perf_counter() - start
+
+    return {
+        'seed': seed,
+        'frames': session.frame,
+        'score': session.score,
+        'state': session.game_sub_state,
+        'sim_time_ms': session.clock.get_ticks(),
+        'elapsed_s': elapsed,
+        'fps': session.frame / elapsed if elapsed else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game simulation headless")
+    parser.add_argument('--frames', type=int, default=3600)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ship', type=int, default=0, choices=[0, 1])
+    parser.add_argument('--render', action='store_true', help="also draw every frame")
+    parser.add_argument('--field', action='store_true', help="simulate asteroids with the NumPy AsteroidField")
+    parser.add_argument('--kernels', action='store_true', help="use the NumPy collision kernels")
+    parser.add_argument('--profile', metavar='PATH', help="dump per-frame phase timings (.csv or .jsonl)")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiler.set_enabled(True)
+        profiler.start_dump(args.profile)
+
+    screen = init_headless()
+    assets = game.load_assets(random.Random(args.seed))
+    result = run(assets, args.frames, args.seed, args.ship, screen=screen if args.render else None,
+                 asteroid_field=args.field, vectorized_collisions=args.kernels)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    if args.profile:
+        profiler.stop_dump()
+        print()
+        print("\n".join(profiler.get_overlay_lines()))
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
@@ -1,53 +1,164 @@
+import heapq
 import json
 import os
 import pygame
+from concurrent.futures import ThreadPoolExecutor
+from text_cache import render_text
+from render import Renderer
+
+# -- Constants --
+HIGHSCORE_FILE = "highscores.json"  # Compacted top scores
+HIGHSCORE_LOG = "highscores.log"  # Scores added since the last compaction, one JSON object per line
+TOP_SCORES = 10
+COMPACT_EVERY = 20  # Log lines written before the log is folded back into the JSON file
 
 # High Score Management
 class HighScoreManager:
-    def __init__(self):
-        self.highscore_file = "highscores.json"
-        self.highscores = self.load_highscores()
-    
-    def load_highscores(self):
-        """Load high scores from file"""
+    """Top scores kept in a bounded min-heap, persisted off the main thread.
+
+    New scores are appended to HIGHSCORE_LOG; every COMPACT_EVERY entries
+    (and on close) the top scores are written to a temp file that replaces
+    HIGHSCORE_FILE atomically, then the log is cleared. Each entry carries
+    a seq number, so a log replayed over a newer JSON file is deduplicated
+    and equal scores keep their arrival order. All file writes run on one
+    background worker, in order. Scores are loaded on first use.
+    """
+
+    def __init__(self, highscore_file=HIGHSCORE_FILE, log_file=HIGHSCORE_LOG, size=TOP_SCORES):
+        self.highscore_file = highscore_file
+        self.log_file = log_file
+        self.size = size
+        self.heap = None  # (score, -seq, name), lowest rank first
+        self.next_seq = 0
+        self.log_lines = 0
+        self.log_torn = False  # Log has a partial line that later appends would run into
+        self.writer = None
+
+    # -- Loading --
+    def load_entries(self):
+        """Read the JSON file and the log, returning entries by seq"""
+        entries = {}
         try:
             with open(self.highscore_file, 'r') as file:
-                scores = json.load(file)
-                # Sort by score descending
-                return sorted(scores, key=lambda x: x['score'], reverse=True)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            # Return empty list if file doesn't exist or is invalid
-            return []
-    
-    def save_highscores(self):
-        """Save high scores to file"""
+                for position, entry in enumerate(json.load(file)):
+                    entries[entry.get('seq', position)] = entry
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
         try:
-            with open(self.highscore_file, 'w') as file:
-                json.dump(self.highscores, file, indent=2)
-        except Exception as e:
-            print(f"Error saving high scores: {e}")
-    
+            with open(self.log_file, 'r') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        self.log_torn = True  # Torn last line from an interrupted write
+                        continue
+                    entries[entry['seq']] = entry
+                    self.log_lines += 1
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def load_highscores(self):
+        """Load high scores from the JSON file and the log"""
+        entries = self.load_entries()
+        self.next_seq = max(entries, default=-1) + 1
+        ranked = heapq.nlargest(self.size, ((entry['score'], -seq, entry['name']) for seq, entry in entries.items()))
+        self.heap = ranked[::-1]  # Ascending order is already a valid min-heap
+        if self.log_torn:
+            self.compact()  # Start a clean log
+            self.log_torn = False
+        return self.get_top_scores()
+
+    def ensure_loaded(self):
+        if self.heap is None:
+            self.load_highscores()
+
+    # -- Scores --
     def add_score(self, name, score):
-        """Add a new score to the high scores"""
-        self.highscores.append({'name': name, 'score': score})
-        # Sort by score descending and keep only top 10
-        self.highscores = sorted(self.highscores, key=lambda x: x['score'], reverse=True)[:10]
-        self.save_highscores()
-    
-    def get_top_scores(self, count=10):
+        """Add a new score and hand the write to the background worker"""
+        self.ensure_loaded()
+        seq = self.next_seq
+        self.next_seq += 1
+        item = (score, -seq, name)
+        if len(self.heap) < self.size:
+            heapq.heappush(self.heap, item)
+        else:
+            heapq.heappushpop(self.heap, item)
+
+        self.submit(self.append_log, {'name': name, 'score': score, 'seq': seq})
+        self.log_lines += 1
+        if self.log_lines >= COMPACT_EVERY:
+            self.compact()
+
+    def get_top_scores(self, count=TOP_SCORES):
         """Get top N scores"""
-        return self.highscores[:count]
-    
+        self.ensure_loaded()
+        ranked = sorted(self.heap, reverse=True)[:count]
+        return [{'name': name, 'score': score} for score, _, name in ranked]
+
     def is_high_score(self, score):
         """Check if score qualifies as a high score (top 10)"""
-        if len(self.highscores) < 10:
+        self.ensure_loaded()
+        if len(self.heap) < self.size:
             return True
-        return score > self.highscores[9]['score']
+        return score > self.heap[0][0]
+
+    # -- Persistence --
+    def submit(self, function, *args):
+        if self.writer is None:
+            self.writer = ThreadPoolExecutor(max_workers=1)
+        return self.writer.submit(function, *args)
+
+    def compact(self):
+        """Queue a rewrite of the JSON file from the heap and a log reset"""
+        ranked = sorted(self.heap, reverse=True)
+        entries = [{'name': name, 'score': score, 'seq': -negative_seq} for score, negative_seq, name in ranked]
+        self.log_lines = 0
+        return self.submit(self.write_snapshot, entries)
+
+    def append_log(self, entry):
+        try:
+            with open(self.log_file, 'a') as file:
+                file.write(json.dumps(entry) + '\n')
+                file.flush()
+                os.fsync(file.fileno())
+        except OSError as e:
+            print(f"Error saving high scores: {e}")
+
+    def write_snapshot(self, entries):
+        """Write entries to a temp file, swap it in, then clear the log"""
+        temp_file = self.highscore_file + '.tmp'
+        try:
+            with open(temp_file, 'w') as file:
+                json.dump(entries, file, indent=2)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_file, self.highscore_file)
+            # Lines still in the log are also in the new file, so losing
+            # this step only means they are deduplicated on the next load
+            open(self.log_file, 'w').close()
+        except OSError as e:
+            print(f"Error saving high scores: {e}")
+
+    def flush(self):
+        """Wait until every queued write has finished"""
+        if self.writer is not None:
+            self.submit(lambda: None).result()
+
+    def close(self):
+        """Compact pending log entries and stop the worker"""
+        if self.heap is not None and self.log_lines:
+            self.compact()
+        if self.writer is not None:
+            self.writer.shutdown(wait=True)
+            self.writer = None
+
+# Shared manager used by the menu, the game loop and the high score screen
+highscore_manager = HighScoreManager()
 
 def draw_text_centered(screen, text, size, x, y, color=(255, 255, 255)):
     """Draw text centered at given position"""
-    font = pygame.font.Font(None, size)
-    text_surface = font.render(text, True, color)
+    text_surface = render_text(text, size, color)
     text_rect = text_surface.get_rect(center=(x, y))
     screen.blit(text_surface, text_rect)
 
@@ -56,6 +167,10 @@ def input_name_screen(screen, clock, score):
     WIDTH = screen.get_width()
     HEIGHT = screen.get_height()
     
+    # Import menu settings (imported here to avoid a circular import)
+    import menu
+    renderer = Renderer(screen, menu.settings['dirty_rendering'])
+    
     name = ""
     input_active = True
     cursor_visible = True
@@ -87,6 +202,11 @@ def input_name_screen(screen, clock, score):
                     if len(name) < 15 and event.unicode.isprintable():
                         name += event.unicode
         
+        # Skip drawing while the name and cursor are unchanged
+        if not renderer.needs_redraw((name, cursor_visible)):
+            renderer.skip_frame()
+            continue
+        
         # Draw
         screen.fill((0, 0, 0))
         
@@ -106,14 +226,13 @@ def input_name_screen(screen, clock, score):
         if cursor_visible:
             display_name += "|"
         
-        font = pygame.font.Font(None, 36)
-        name_surface = font.render(display_name, True, (255, 255, 255))
+        name_surface = render_text(display_name, 36, (255, 255, 255))
         screen.blit(name_surface, (input_box.x + 5, input_box.y + 5))
         
         # Instructions
         draw_text_centered(screen, "Press ENTER to save, ESC to skip", 24, WIDTH//2, HEIGHT//2 + 80, (200, 200, 200))
         
-        pygame.display.flip()
+        renderer.present_full()
     
     return None
 
@@ -122,6 +241,10 @@ def show_highscores(screen, clock, highscore_manager):
     WIDTH = screen.get_width()
     HEIGHT = screen.get_height()
     
+    # Import menu settings (imported here to avoid a circular import)
+    import menu
+    renderer = Renderer(screen, menu.settings['dirty_rendering'])
+    
     scores = highscore_manager.get_top_scores(10)
     
     while True:
@@ -134,6 +257,11 @@ def show_highscores(screen, clock, highscore_manager):
                 if event.key == pygame.K_ESCAPE or event.key == pygame.K_RETURN:
                     return "MENU"
         
+        # The table never changes while this screen is open
+        if not renderer.needs_redraw(len(scores)):
+            renderer.skip_frame()
+            continue
+        
         # Draw
         screen.fill((0, 0, 0))
         
@@ -149,16 +277,15 @@ def show_highscores(screen, clock, highscore_manager):
                 score = f"{score_data['score']:,}"
                 
                 # Rank
-                font = pygame.font.Font(None, 32)
-                rank_surface = font.render(rank, True, (255, 255, 255))
+                rank_surface = render_text(rank, 32, (255, 255, 255))
                 screen.blit(rank_surface, (WIDTH//2 - 200, y_pos))
                 
                 # Name
-                name_surface = font.render(name, True, (255, 255, 255))
+                name_surface = render_text(name, 32, (255, 255, 255))
                 screen.blit(name_surface, (WIDTH//2 - 150, y_pos))
                 
                 # Score
-                score_surface = font.render(score, True, (255, 255, 255))
+                score_surface = render_text(score, 32, (255, 255, 255))
                 score_rect = score_surface.get_rect()
                 screen.blit(score_surface, (WIDTH//2 + 150 - score_rect.width, y_pos))
         else:
@@ -167,4 +294,4 @@ def show_highscores(screen, clock, highscore_manager):
         # Instructions
         draw_text_centered(screen, "Press ESC or ENTER to return to menu", 24, WIDTH//2, HEIGHT - 50, (200, 200, 200))
         
-        pygame.display.flip()
\ No newline at end of file
+        renderer.present_full()
\ No newline at end of file
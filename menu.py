@@ -1,7 +1,12 @@
 import pygame
 import sys
 import os
-from highscore import HighScoreManager, show_highscores
+import core
+import asteroid_field
+from highscore import show_highscores
+from text_cache import render_text
+from render import Renderer, brightness_filter
+from asset_manager import GAME_ASSETS_FOLDER
 
 # -- Constants --
 HEIGHT = 700
@@ -14,16 +19,22 @@ BUTTON_INACTIVE_COLOR = (20, 50, 100)
 BUTTON_ACTIVE_COLOR = (40, 80, 150)
 SLIDER_TRACK_COLOR = (60, 60, 60)
 SLIDER_HANDLE_COLOR = (100, 150, 200)
+SHIP_PREVIEW_SIZE = (80, 80)
 
 # -- Global Settings --
 settings = {
-    'brightness': 0.8  # 0.0 to 1.0
+    'brightness': 0.8,  # 0.0 to 1.0
+    'dirty_rendering': False,  # Redraw only changed screen regions
+    'asteroid_field': False,  # Simulate asteroids with NumPy arrays (needs numpy)
+    'vector_collisions': False,  # Batched NumPy collision kernels (needs numpy)
+    'max_fps': 60  # Render frame cap in game (0 = uncapped); the simulation stays at 60 steps/s
 }
+FPS_CAPS = [30, 60, 120, 0]  # Cycled with F in options
 
 # -- Ship Animation Class --
 class ShipDisplay:
-    def __init__(self, ship_animations):
-        self.ship_animations = ship_animations  # List of animation frames per ship
+    def __init__(self, ship_variants):
+        self.ship_variants = ship_variants  # Variant table per ship (see core.build_ship_variants)
         
         # Frame animation with direction
         self.frame_index = 0
@@ -45,25 +56,20 @@ class ShipDisplay:
         self.frame_timer += 1
         if self.frame_timer >= self.frame_speed:
             self.frame_timer = 0
-            if len(self.ship_animations) > 0 and len(self.ship_animations[0]) > 0:
-                self.frame_index = (self.frame_index + 1) % len(self.ship_animations[0])
+            if len(self.ship_variants) > 0:
+                self.frame_index = (self.frame_index + 1) % len(self.ship_variants[0][(True, False)])
     
     def draw(self, surface, ship_type, x, y):
-        # Gambar ship dengan frame animasi dan arah
-        if ship_type < len(self.ship_animations) and len(self.ship_animations[ship_type]) > 0:
-            ship_img = self.ship_animations[ship_type][self.frame_index]
-            
-            # Flip horizontally jika menghadap kiri
-            if self.direction == -1:  # Facing left
-                ship_img = pygame.transform.flip(ship_img, True, False)
-            
+        # Gambar ship dengan frame animasi dan arah (frame menghadap kiri sudah di-flip)
+        if ship_type < len(self.ship_variants):
+            facing_right = self.direction == 1
+            ship_img = self.ship_variants[ship_type][(facing_right, False)][self.frame_index]
             ship_rect = ship_img.get_rect(center=(x, y))
             surface.blit(ship_img, ship_rect)
 
 # -- Utility Functions --
 def draw_text(surface, text, size, x, y, color=WHITE):
-    font = pygame.font.Font(None, size)
-    text_surface = font.render(text, True, color)
+    text_surface = render_text(text, size, color)
     text_rect = text_surface.get_rect(center=(x, y))
     surface.blit(text_surface, text_rect)
 
@@ -88,8 +94,7 @@ def draw_slider(surface, x, y, width, height, value, label):
         new_value = max(0.0, min(1.0, relative_x / width))
     
     # Draw label and value
-    font = pygame.font.Font(None, 24)
-    label_text = font.render(f"{label}: {int(value * 100)}%", True, WHITE)
+    label_text = render_text(f"{label}: {int(value * 100)}%", 24, WHITE)
     surface.blit(label_text, (x, y - 30))
     
     return new_value
@@ -108,15 +113,42 @@ def draw_button(surface, text, x, y, width, height):
     else:
         pygame.draw.rect(surface, BUTTON_INACTIVE_COLOR, rect)
 
-    font = pygame.font.Font(None, 30)
-    text_surface = font.render(text, True, WHITE)
+    text_surface = render_text(text, 30, WHITE)
     text_rect = text_surface.get_rect(center=rect.center)
     surface.blit(text_surface, text_rect)
     return False
 
+# -- Loading Screen --
+def draw_loading_frame(surface, progress):
+    """Draw the loading screen with a progress bar (progress 0.0 to 1.0)"""
+    surface.fill(BLACK)
+    draw_text(surface, "SPACE SHOOTER", 64, WIDTH / 2, HEIGHT / 6)
+    draw_text(surface, f"Loading... {int(progress * 100)}%", 30, WIDTH / 2, HEIGHT / 2 - 40)
+    
+    # Progress bar
+    bar_rect = pygame.Rect(WIDTH / 2 - 150, HEIGHT / 2, 300, 20)
+    pygame.draw.rect(surface, SLIDER_TRACK_COLOR, bar_rect)
+    fill_rect = pygame.Rect(bar_rect.x, bar_rect.y, int(bar_rect.width * progress), bar_rect.height)
+    pygame.draw.rect(surface, SLIDER_HANDLE_COLOR, fill_rect)
+
+def loading_screen(screen, clock, load_job):
+    """Show progress until load_job (an asset_manager.LoadJob) is finished"""
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return "QUIT"
+        
+        progress = load_job.poll()
+        draw_loading_frame(screen, progress)
+        pygame.display.flip()
+        if progress >= 1.0:
+            return "MENU"
+        clock.tick(60)
+
 # -- Options Menu Loop --
 def options_loop(screen, clock):
     global settings
+    renderer = Renderer(screen, settings['dirty_rendering'])
     
     while True:
         clock.tick(60)
@@ -128,6 +160,22 @@ def options_loop(screen, clock):
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return "MENU"  # Back to main menu
+                if event.key == pygame.K_d:
+                    settings['dirty_rendering'] = not settings['dirty_rendering']
+                    renderer.dirty = settings['dirty_rendering']
+                if event.key == pygame.K_f:
+                    settings['max_fps'] = FPS_CAPS[(FPS_CAPS.index(settings['max_fps']) + 1) % len(FPS_CAPS)]
+                if event.key == pygame.K_n and asteroid_field.is_available():
+                    settings['asteroid_field'] = not settings['asteroid_field']
+                if event.key == pygame.K_v and asteroid_field.is_available():
+                    settings['vector_collisions'] = not settings['vector_collisions']
+
+        # Skip drawing while nothing on screen can change
+        scene_key = (pygame.mouse.get_pos(), pygame.mouse.get_pressed()[0], settings['brightness'], settings['dirty_rendering'],
+                     settings['asteroid_field'], settings['vector_collisions'], settings['max_fps'])
+        if not renderer.needs_redraw(scene_key):
+            renderer.skip_frame()
+            continue
 
         # Drawing
         screen.fill(BLACK)
@@ -135,6 +183,17 @@ def options_loop(screen, clock):
         
         # Brightness slider
         settings['brightness'] = draw_slider(screen, WIDTH / 2 - 150, HEIGHT / 2, 300, 20, settings['brightness'], "Brightness")
+        dirty_label = "On" if settings['dirty_rendering'] else "Off"
+        fps_label = settings['max_fps'] or "Uncapped"
+        draw_text(screen, f"D: Dirty-rect rendering: {dirty_label}   F: FPS cap: {fps_label}", 20, WIDTH / 2, HEIGHT / 2 + 40,
+                  (200, 200, 200))
+        if asteroid_field.is_available():
+            field_label = "On" if settings['asteroid_field'] else "Off"
+            kernel_label = "On" if settings['vector_collisions'] else "Off"
+            numpy_text = f"N: NumPy asteroids: {field_label}   V: NumPy collisions: {kernel_label}"
+        else:
+            numpy_text = "N / V: NumPy asteroids & collisions need NumPy"
+        draw_text(screen, numpy_text, 20, WIDTH / 2, HEIGHT / 2 + 58, (200, 200, 200))
         
         # Controls information
         draw_text(screen, "CONTROLS", 36, WIDTH / 2, HEIGHT / 2 + 80, WHITE)
@@ -147,12 +206,9 @@ def options_loop(screen, clock):
         draw_text(screen, "Ship Selection:", 24, WIDTH / 2, HEIGHT / 2 + 240, (200, 200, 200))
         draw_text(screen, "← → Arrow Keys (in menu)", 20, WIDTH / 2, HEIGHT / 2 + 265, WHITE)
         
-        # Apply brightness overlay
-        if settings['brightness'] < 1.0:
-            overlay = pygame.Surface((WIDTH, HEIGHT))
-            overlay.fill(BLACK)
-            overlay.set_alpha(int((1.0 - settings['brightness']) * 255))
-            screen.blit(overlay, (0, 0))
+        # Apply brightness (cached, only recomputed when the slider moves)
+        brightness_filter.set_brightness(settings['brightness'])
+        brightness_filter.apply(screen)
         
         # Back button
         back_button = draw_button(screen, "Back", WIDTH / 2 - 100, HEIGHT - 100, 200, 50)
@@ -160,36 +216,48 @@ def options_loop(screen, clock):
         if back_button:
             return "MENU"
             
-        pygame.display.flip()
+        renderer.present_full()
 
 # -- Main Menu Loop --
-def menu_loop(screen, clock):
-    # Load ship animations (frame 1, 2, 3)
-    assets_folder = "Assets"
-    game_assets_folder = os.path.join(assets_folder, "PixelSpaceRage", "256px")
+def draw_menu_frame(screen, ship_display, selected_ship):
+    """Draw the main menu; returns the clicked state of Play, High Scores, Options and Quit"""
+    screen.fill(BLACK)
+    draw_text(screen, "SPACE SHOOTER", 64, WIDTH / 2, HEIGHT / 6)
     
-    ship_animations = []
-    ship_names = ['Blue', 'Red']
-    ship_prefixes = ['PlayerBlue_Frame_', 'PlayerRed_Frame_']
+    # Ship selection display
+    draw_text(screen, "Select Ship:", 30, WIDTH / 2, HEIGHT / 2 - 120)
+    
+    # Draw ship image dengan animasi (tanpa tulisan < Blue > atau < Red >)
+    ship_display.draw(screen, selected_ship, WIDTH / 2, HEIGHT / 2 - 50)
     
-    # Load ship animation frames
-    for prefix in ship_prefixes:
-        frames = []
-        for frame_num in ['01', '02', '03']:
-            try:
-                img_path = os.path.join(game_assets_folder, f"{prefix}{frame_num}_png_processed.png")
-                img = pygame.image.load(img_path).convert_alpha()
-                img = pygame.transform.scale(img, (80, 80))  # Scale untuk display
-                frames.append(img)
-            except:
-                # Fallback jika gambar tidak ditemukan
-                fallback_surface = pygame.Surface((80, 80))
-                fallback_surface.fill((100, 100, 100))
-                frames.append(fallback_surface)
-        ship_animations.append(frames)
+    # Draw ship description
+    descriptions = [
+        "Balanced fighter with standard speed",
+        "Fast fighter with increased speed"
+    ]
+    draw_text(screen, descriptions[selected_ship], 24, WIDTH / 2, HEIGHT / 2 + 10)
+    
+    # Buttons
+    play_button = draw_button(screen, "Play", WIDTH / 2 - 100, HEIGHT / 2 + 80, 200, 50)
+    highscore_button = draw_button(screen, "High Scores", WIDTH / 2 - 100, HEIGHT / 2 + 140, 200, 50)
+    options_button = draw_button(screen, "Options", WIDTH / 2 - 100, HEIGHT / 2 + 200, 200, 50)
+    quit_button = draw_button(screen, "Quit", WIDTH / 2 - 100, HEIGHT / 2 + 260, 200, 50)
+
+    return play_button, highscore_button, options_button, quit_button
+
+def get_menu_scene_key(ship_display, selected_ship):
+    """Everything the main menu shows; the frame is only redrawn when this changes"""
+    return (pygame.mouse.get_pos(), pygame.mouse.get_pressed()[0], selected_ship,
+            ship_display.frame_index, ship_display.direction)
+
+def menu_loop(screen, clock):
+    # Ship animations (frame 1, 2, 3) with pre-flipped variants, built once per process
+    ship_names = ['Blue', 'Red']
+    ship_variants = [core.get_ship_variants(GAME_ASSETS_FOLDER, name, SHIP_PREVIEW_SIZE) for name in ship_names]
     
     selected_ship = 0
-    ship_display = ShipDisplay(ship_animations)
+    ship_display = ShipDisplay(ship_variants)
+    renderer = Renderer(screen, settings['dirty_rendering'])
     
     while True:
         clock.tick(60)
@@ -210,28 +278,13 @@ def menu_loop(screen, clock):
         # Update animasi
         ship_display.update()
 
+        # Skip drawing while nothing on screen can change
+        if not renderer.needs_redraw(get_menu_scene_key(ship_display, selected_ship)):
+            renderer.skip_frame()
+            continue
+
         # Drawing
-        screen.fill(BLACK)
-        draw_text(screen, "SPACE SHOOTER", 64, WIDTH / 2, HEIGHT / 6)
-        
-        # Ship selection display
-        draw_text(screen, "Select Ship:", 30, WIDTH / 2, HEIGHT / 2 - 120)
-        
-        # Draw ship image dengan animasi (tanpa tulisan < Blue > atau < Red >)
-        ship_display.draw(screen, selected_ship, WIDTH / 2, HEIGHT / 2 - 50)
-        
-        # Draw ship description
-        descriptions = [
-            "Balanced fighter with standard speed",
-            "Fast fighter with increased speed"
-        ]
-        draw_text(screen, descriptions[selected_ship], 24, WIDTH / 2, HEIGHT / 2 + 10)
-        
-        # Buttons
-        play_button = draw_button(screen, "Play", WIDTH / 2 - 100, HEIGHT / 2 + 80, 200, 50)
-        highscore_button = draw_button(screen, "High Scores", WIDTH / 2 - 100, HEIGHT / 2 + 140, 200, 50)
-        options_button = draw_button(screen, "Options", WIDTH / 2 - 100, HEIGHT / 2 + 200, 200, 50)
-        quit_button = draw_button(screen, "Quit", WIDTH / 2 - 100, HEIGHT / 2 + 260, 200, 50)
+        play_button, highscore_button, options_button, quit_button = draw_menu_frame(screen, ship_display, selected_ship)
 
         if play_button:
             return ("PLAYING", selected_ship)
@@ -242,5 +295,5 @@ def menu_loop(screen, clock):
         if quit_button:
             return "QUIT"
             
-        pygame.display.flip()
+        renderer.present_full()
 
@@ -0,0 +1,80 @@
+import pygame
+
+# -- Constants --
+DEFAULT_POOL_SIZE = 64  # Free sprites kept per pool; extras are left to the GC
+
+# -- Pooled Sprite Base --
+class PooledSprite(pygame.sprite.Sprite):
+    """Sprite that returns itself to its pool when killed.
+
+    Subclasses put their constructor logic in reset(*args) so a recycled
+    sprite can be re-initialised in place instead of rebuilt; rect is
+    allocated once here and only moved/resized by reset. pygame's Sprite
+    base has no __slots__, so attributes still live in a __dict__; pooling
+    saves the allocations, not per-sprite memory.
+    """
+
+    def __init__(self, *args):
+        super().__init__()
+        self.pool = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(*args)
+
+    def reset(self, *args):
+        raise NotImplementedError
+
+    def kill(self):
+        if self.alive():
+            super().kill()
+            if self.pool is not None:
+                self.pool.release(self)
+
+# -- Sprite Pool --
+class SpritePool:
+    """Free list of PooledSprite instances of one class"""
+
+    def __init__(self, sprite_class, max_size=DEFAULT_POOL_SIZE):
+        self.sprite_class = sprite_class
+        self.max_size = max_size
+        self.free = []
+
+        # Statistics
+        self.hits = 0  # Served from the free list
+        self.misses = 0  # Had to construct a new sprite
+        self.discarded = 0  # Released while the free list was full
+        self.in_use = 0
+        self.high_water = 0  # Most sprites in use at once
+
+    def acquire(self, *args):
+        """Return a sprite initialised with args, recycled if possible"""
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+            self.hits += 1
+        else:
+            sprite = self.sprite_class(*args)
+            sprite.pool = self
+            self.misses += 1
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return sprite
+
+    def release(self, sprite):
+        """Take back a killed sprite"""
+        self.in_use -= 1
+        if len(self.free) < self.max_size:
+            self.free.append(sprite)
+        else:
+            self.discarded += 1
+
+    def get_stats(self):
+        """Get pool counters for the HUD and profiler"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'discarded': self.discarded,
+            'in_use': self.in_use,
+            'free': len(self.free),
+            'high_water': self.high_water
+        }
@@ -0,0 +1,222 @@
+import csv
+import json
+import time
+from collections import deque
+from text_cache import TextCache
+
+# -- Constants --
+PROFILE_WINDOW = 120  # Frames kept for the rolling min/avg/p99
+OVERLAY_REFRESH_FRAMES = 15  # Overlay text is rebuilt this often, not every frame
+OVERLAY_FONT_SIZE = 18
+OVERLAY_LINE_HEIGHT = 16
+OVERLAY_COLOR = (0, 255, 0)
+OVERLAY_CACHE_ENTRIES = 64  # About two refreshes of overlay lines; the numbers rarely repeat
+
+# -- Timing Scopes --
+class ProfileScope:
+    """Context manager adding the time spent inside it to one phase"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_time(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+class NullScope:
+    """Scope used while the profiler is off; costs one method call"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_SCOPE = NullScope()
+
+# -- Profiler --
+class Profiler:
+    """Per-frame timings of named phases, with rolling stats and a dump file.
+
+    Wrap each phase in `with profiler.scope(name):` and call begin_frame()
+    / end_frame() around every frame. A phase entered several times in one
+    frame is summed. While disabled, scope() returns a shared no-op scope.
+    """
+
+    def __init__(self, window=PROFILE_WINDOW, enabled=False):
+        self.window = window
+        self.enabled = enabled
+        self.samples = {}  # phase -> deque of ms, one per frame
+        self.current = {}  # phase -> ms so far this frame
+        self.frame_times = deque(maxlen=window)  # ms of work per frame
+        self.frame_intervals = deque(maxlen=window)  # ms between frame starts (for FPS)
+        self.counts = {}  # Latest counters (sprites per group, pool usage ...)
+        self.frame_start = None
+        self.frame = 0
+
+        # Dump file
+        self.dump_file = None
+        self.dump_format = None  # 'csv' or 'jsonl'
+        self.dump_writer = None
+
+        # Overlay
+        self.overlay_commands = []
+        self.overlay_frame = None
+        # Own font and cache, so the ever-changing numbers do not evict
+        # HUD / menu text or skew the shared text_cache's hit counters
+        self.overlay_text = TextCache(OVERLAY_CACHE_ENTRIES)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.frame_start = None
+
+    def scope(self, name):
+        """Return a context manager timing one phase"""
+        if not self.enabled:
+            return NULL_SCOPE
+        return ProfileScope(self, name)
+
+    def add_time(self, name, ms):
+        self.current[name] = self.current.get(name, 0.0) + ms
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame_intervals.append((now - self.frame_start) * 1000)
+        self.frame_start = now
+        self.current = {}
+
+    def end_frame(self, counts=None):
+        """Close the frame: store phase samples, counters and dump a row"""
+        if not self.enabled or self.frame_start is None:
+            return
+        self.frame += 1
+        frame_ms = (time.perf_counter() - self.frame_start) * 1000
+        self.frame_times.append(frame_ms)
+        for name in self.current:
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+        for name, samples in self.samples.items():
+            samples.append(self.current.get(name, 0.0))
+        if counts is not None:
+            self.counts = counts
+        if self.dump_file is not None:
+            self.write_row(frame_ms)
+
+    # -- Statistics --
+    def get_fps(self):
+        if not self.frame_intervals:
+            return 0.0
+        return 1000 * len(self.frame_intervals) / sum(self.frame_intervals)
+
+    def get_stats(self):
+        """Rolling min/avg/p99 in ms per phase, plus 'frame' for the whole frame"""
+        stats = {'frame': summarize(self.frame_times)}
+        for name, samples in self.samples.items():
+            stats[name] = summarize(samples)
+        return stats
+
+    def reset(self):
+        """Forget all samples (e.g. between benchmark scenarios)"""
+        self.samples.clear()
+        self.current = {}
+        self.frame_times.clear()
+        self.frame_intervals.clear()
+        self.counts = {}
+        self.frame_start = None
+        self.frame = 0
+
+    # -- Dump --
+    def start_dump(self, path):
+        """Write one row per frame to path, as CSV or JSON lines by extension.
+
+        CSV columns are fixed by the first frame written; phases that
+        first appear later are only in the JSONL format.
+        """
+        self.stop_dump()
+        self.dump_format = 'jsonl' if path.endswith('.jsonl') else 'csv'
+        self.dump_file = open(path, 'w', newline='')
+        self.dump_writer = None
+
+    def stop_dump(self):
+        if self.dump_file is not None:
+            self.dump_file.close()
+        self.dump_file = None
+        self.dump_writer = None
+
+    def is_dumping(self):
+        return self.dump_file is not None
+
+    def write_row(self, frame_ms):
+        row = {'frame': self.frame, 'frame_ms': round(frame_ms, 4)}
+        row.update((name, round(self.current.get(name, 0.0), 4)) for name in self.samples)
+        row.update(flatten_counts(self.counts))
+        if self.dump_format == 'jsonl':
+            self.dump_file.write(json.dumps(row) + '\n')
+            return
+        if self.dump_writer is None:
+            self.dump_writer = csv.DictWriter(self.dump_file, fieldnames=list(row), restval=0,
+                                              extrasaction='ignore')
+            self.dump_writer.writeheader()
+        self.dump_writer.writerow(row)
+
+    # -- Overlay --
+    def get_overlay_lines(self):
+        stats = self.get_stats()
+        lines = [f"FPS {self.get_fps():5.1f}   frame {stats['frame']['avg']:.2f} ms avg",
+                 "phase               min    avg    p99 (ms)"]
+        for name in sorted(self.samples):
+            phase = stats[name]
+            lines.append(f"{name:<18}{phase['min']:6.2f} {phase['avg']:6.2f} {phase['p99']:6.2f}")
+        for group, values in self.counts.items():
+            if isinstance(values, dict):
+                lines.append(f"{group}: " + " ".join(f"{key} {value}" for key, value in values.items()))
+            else:
+                lines.append(f"{group}: {values}")
+        return lines
+
+    def get_overlay_commands(self, x=10, y=10):
+        """(surface, rect) commands for the overlay text, refreshed every few frames"""
+        if self.overlay_frame is None or self.frame - self.overlay_frame >= OVERLAY_REFRESH_FRAMES:
+            self.overlay_frame = self.frame
+            self.overlay_commands = []
+            for i, line in enumerate(self.get_overlay_lines()):
+                surface = self.overlay_text.render(line, OVERLAY_FONT_SIZE, OVERLAY_COLOR)
+                self.overlay_commands.append((surface, surface.get_rect(topleft=(x, y + i * OVERLAY_LINE_HEIGHT))))
+        return self.overlay_commands
+
+# -- Helpers --
+def summarize(samples):
+    """min/avg/p99 of a sequence of ms values"""
+    if not samples:
+        return {'min': 0.0, 'avg': 0.0, 'p99': 0.0}
+    ordered = sorted(samples)
+    return {
+        'min': ordered[0],
+        'avg': sum(ordered) / len(ordered),
+        'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    }
+
+def flatten_counts(counts):
+    """{'sprites': {'all': 3}} -> {'sprites.all': 3} for dump rows"""
+    flat = {}
+    for group, values in counts.items():
+        if isinstance(values, dict):
+            for key, value in values.items():
+                flat[f"{group}.{key}"] = value
+        else:
+            flat[group] = values
+    return flat
+
+# Shared profiler, toggled in game with F3
+profiler = Profiler()
@@ -0,0 +1,221 @@
+import pygame
+from profiler import profiler
+
+# -- Constants --
+BLACK = (0, 0, 0)
+MAX_DIRTY_RECTS = 96  # More changed regions than this -> redraw the full screen
+FULL_REDRAW_RATIO = 0.5  # Changed area above this share of the screen -> full redraw
+
+# -- Renderer --
+class Renderer:
+    """Presents frames either by full redraw + flip or by dirty rectangles.
+
+    Sprite scenes are described as draw commands, (surface, rect) pairs
+    blitted in order. With dirty=True only commands that appeared,
+    disappeared or moved since the previous frame mark the screen dirty;
+    each dirty rect is then cleared and repainted (commands, post-process
+    and top commands clipped to it) and pushed with pygame.display.update.
+    Static screens use needs_redraw(scene_key) to skip frames entirely
+    while nothing they show has changed.
+    """
+
+    def __init__(self, screen, dirty=False, background=BLACK):
+        self.screen = screen
+        self.dirty = dirty
+        self.background = background
+        self.screen_rect = screen.get_rect()
+        self.previous_commands = None  # set of command keys drawn last frame
+        self.previous_post_key = None
+        self.scene_key = None
+
+        # Statistics
+        self.frames = 0
+        self.skipped_frames = 0
+        self.full_frames = 0
+        self.pixels_pushed = 0  # Area handed to the display
+        self.pixels_blitted = 0  # Area filled and blitted while drawing
+
+    def invalidate(self):
+        """Force a full redraw next frame (e.g. another screen drew over ours)"""
+        self.previous_commands = None
+        self.scene_key = None
+
+    # -- Static Screens --
+    def needs_redraw(self, scene_key):
+        """True if a static screen must be redrawn for this scene_key.
+
+        Without dirty rendering every frame is redrawn. Otherwise the
+        screen is only redrawn when scene_key (a tuple of everything the
+        screen shows) differs from the last drawn one; call skip_frame()
+        when this returns False.
+        """
+        if not self.dirty or scene_key != self.scene_key:
+            self.scene_key = scene_key
+            return True
+        return False
+
+    def present_full(self, pixels_blitted=None):
+        """Push the whole screen after a full redraw"""
+        with profiler.scope('present'):
+            pygame.display.flip()
+        screen_area = get_area(self.screen_rect)
+        self.frames += 1
+        self.full_frames += 1
+        self.pixels_pushed += screen_area
+        self.pixels_blitted += screen_area if pixels_blitted is None else pixels_blitted
+
+    def skip_frame(self):
+        """Record a frame where nothing changed and nothing was drawn"""
+        self.frames += 1
+        self.skipped_frames += 1
+
+    # -- Sprite Scenes --
+    def render(self, commands, post_process=None, top_commands=()):
+        """Draw and present a frame made of commands, a post-process and top commands.
+
+        commands and top_commands are lists of (surface, rect); post_process
+        is a stage like BrightnessFilter (or None) applied between the two.
+        A change of post_process.get_key() forces a full redraw.
+        """
+        post_key = post_process.get_key() if post_process is not None else None
+        if not self.dirty or self.previous_commands is None or post_key != self.previous_post_key:
+            self.render_full(commands, post_process, top_commands)
+            return
+
+        all_commands = commands + list(top_commands)
+        current = set((surface, tuple(rect)) for surface, rect in all_commands)
+        changed = current.symmetric_difference(self.previous_commands)
+        self.previous_commands = current
+        if not changed:
+            self.skip_frame()
+            return
+
+        visible = [self.screen_rect.clip(rect) for _, rect in changed]
+        dirty_rects = merge_rects([rect for rect in visible if rect.width and rect.height])
+        dirty_area = sum(get_area(rect) for rect in dirty_rects)
+        screen_area = get_area(self.screen_rect)
+        if len(dirty_rects) > MAX_DIRTY_RECTS or dirty_area > screen_area * FULL_REDRAW_RATIO:
+            self.render_full(commands, post_process, top_commands)
+            return
+
+        screen = self.screen
+        command_rects = [rect for _, rect in commands]
+        top_rects = [rect for _, rect in top_commands]
+        for dirty_rect in dirty_rects:
+            screen.set_clip(dirty_rect)
+            with profiler.scope('draw'):
+                screen.fill(self.background)
+                blitted = get_area(dirty_rect)
+                for index in dirty_rect.collidelistall(command_rects):
+                    surface, rect = commands[index]
+                    screen.blit(surface, rect)
+                    blitted += get_area(rect.clip(dirty_rect))
+            if post_process is not None:
+                with profiler.scope('post_process'):
+                    post_process.apply(screen, dirty_rect)
+                blitted += get_area(dirty_rect)
+            with profiler.scope('draw'):
+                for index in dirty_rect.collidelistall(top_rects):
+                    surface, rect = top_commands[index]
+                    screen.blit(surface, rect)
+                    blitted += get_area(rect.clip(dirty_rect))
+            self.pixels_blitted += blitted
+        screen.set_clip(None)
+
+        with profiler.scope('present'):
+            pygame.display.update(dirty_rects)
+        self.frames += 1
+        self.pixels_pushed += dirty_area
+
+    def render_full(self, commands, post_process=None, top_commands=()):
+        """Redraw everything and flip"""
+        screen = self.screen
+        with profiler.scope('draw'):
+            screen.fill(self.background)
+            screen.blits(commands, doreturn=False)
+        if post_process is not None:
+            with profiler.scope('post_process'):
+                post_process.apply(screen)
+        with profiler.scope('draw'):
+            screen.blits(top_commands, doreturn=False)
+        self.previous_commands = set((surface, tuple(rect)) for surface, rect in commands + list(top_commands))
+        self.previous_post_key = post_process.get_key() if post_process is not None else None
+
+        blitted = get_area(self.screen_rect) * (2 if post_process is not None else 1)
+        blitted += sum(get_area(rect.clip(self.screen_rect)) for _, rect in commands)
+        blitted += sum(get_area(rect.clip(self.screen_rect)) for _, rect in top_commands)
+        self.present_full(blitted)
+
+    def get_stats(self):
+        """Get pixel counters, including averages per frame"""
+        frames = max(1, self.frames)
+        return {
+            'frames': self.frames,
+            'skipped_frames': self.skipped_frames,
+            'full_frames': self.full_frames,
+            'pixels_pushed': self.pixels_pushed,
+            'pixels_blitted': self.pixels_blitted,
+            'pushed_per_frame': self.pixels_pushed / frames,
+            'blitted_per_frame': self.pixels_blitted / frames
+        }
+
+# -- Post-Process Stages --
+class BrightnessFilter:
+    """Darkens the frame by a brightness factor (0.0 to 1.0).
+
+    The black alpha overlay is built once per brightness value and screen
+    size and reused every frame, so it is only rebuilt when the slider
+    moves.
+    """
+
+    def __init__(self, brightness=1.0):
+        self.brightness = brightness
+        self.overlay = None
+        self.overlay_key = None  # (size, alpha) the overlay was built for
+
+    def set_brightness(self, brightness):
+        self.brightness = brightness
+
+    def is_active(self):
+        return self.brightness < 1.0
+
+    def get_key(self):
+        """Value identifying the current output, for invalidating cached frames"""
+        return self.brightness
+
+    def get_overlay(self, size):
+        """Return the cached overlay for size, rebuilding it if brightness changed"""
+        alpha = int((1.0 - self.brightness) * 255)
+        if self.overlay_key != (size, alpha):
+            self.overlay = pygame.Surface(size)
+            self.overlay.fill(BLACK)
+            self.overlay.set_alpha(alpha)
+            self.overlay_key = (size, alpha)
+        return self.overlay
+
+    def apply(self, surface, rect=None):
+        """Darken surface (or just rect of it) in place"""
+        if self.is_active():
+            overlay = self.get_overlay(surface.get_size())
+            if rect is None:
+                surface.blit(overlay, (0, 0))
+            else:
+                surface.blit(overlay, rect, rect)
+
+# Shared brightness stage, driven by menu.settings['brightness']
+brightness_filter = BrightnessFilter()
+
+# -- Helpers --
+def get_area(rect):
+    return rect.width * rect.height
+
+def merge_rects(rects):
+    """Union rects that overlap so overlapping regions are painted once"""
+    merged = []
+    for rect in rects:
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect = rect.union(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
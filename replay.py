@@ -0,0 +1,236 @@
+"""Input recording and deterministic headless replay.
+
+A replay holds everything a GameSession depends on: the RNG seed, the
+start time of its clock, the ship, the meteor sizes and one input
+bitmask per simulation step. The masks are run-length encoded: a mask
+byte followed by how many steps in a row it was held (LEB128 varint).
+
+Usage:
+    python replay.py replays/replay_20250101_120000.ssr [--render] [--profile out.csv|out.jsonl]
+                     [--field] [--kernels]
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+import core
+
+# -- Constants --
+REPLAY_FOLDER = "replays"
+MAX_REPLAYS = 20  # Older recordings are deleted when a new one is saved
+REPLAY_MAGIC = b'SSREPL01'
+HEADER_FORMAT = '<8sQddQIBBB'  # magic, seed, start_ms, step_ms, score, steps, ship, flags, meteor count
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+FLAG_ASTEROID_FIELD = 1
+FLAG_VECTORIZED_COLLISIONS = 2
+
+# Input bits: keys held during a step, then keys pressed just before it
+HELD_BITS = [(1, pygame.K_LEFT), (2, pygame.K_RIGHT), (4, pygame.K_UP), (8, pygame.K_DOWN)]
+PRESS_BITS = [(16, pygame.K_SPACE), (32, pygame.K_p)]  # Applied in this order
+HELD_KEYS = {  # Player.update treats WASD and the arrows alike
+    1: (pygame.K_LEFT, pygame.K_a), 2: (pygame.K_RIGHT, pygame.K_d),
+    4: (pygame.K_UP, pygame.K_w), 8: (pygame.K_DOWN, pygame.K_s)
+}
+RECORDED_PRESSES = {key for _, key in PRESS_BITS}
+
+# -- Input --
+def encode_input(keys, presses=()):
+    """Bitmask for pygame.key.get_pressed() state plus the keys pressed this step"""
+    mask = 0
+    for bit, key_pair in HELD_KEYS.items():
+        if keys[key_pair[0]] or keys[key_pair[1]]:
+            mask |= bit
+    for bit, key in PRESS_BITS:
+        if key in presses:
+            mask |= bit
+    return mask
+
+class ReplayInput(core.ScriptedInput):
+    """Input source driven by one bitmask per step.
+
+    Live games call set_mask() before every step; replays pass the
+    recorded masks and next_frame() walks through them.
+    """
+    def __init__(self, masks=()):
+        super().__init__()
+        self.masks = iter(masks)
+        self.mask = 0
+
+    def next_frame(self):
+        self.set_mask(next(self.masks, 0))
+        self.frame += 1
+
+    def set_mask(self, mask):
+        self.mask = mask
+        self.held = frozenset(key for bit, key in HELD_BITS if mask & bit)
+        self.pressed = [key for bit, key in PRESS_BITS if mask & bit]
+
+# -- Encoding --
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def encode_runs(runs):
+    out = bytearray()
+    for mask, count in runs:
+        out.append(mask)
+        write_varint(out, count)
+    return bytes(out)
+
+def decode_masks(data, offset, steps):
+    """Expand run-length encoded masks back to one mask per step"""
+    masks = []
+    while len(masks) < steps:
+        mask = data[offset]
+        count, offset = read_varint(data, offset + 1)
+        masks.extend([mask] * count)
+    return masks
+
+# -- Replay --
+class Replay:
+    """A decoded replay: session settings plus one input mask per step"""
+
+    def __init__(self, seed, start_ms, step_ms, selected_ship, meteor_sizes, masks,
+                 asteroid_field=False, vectorized_collisions=False, score=0):
+        self.seed = seed
+        self.start_ms = start_ms
+        self.step_ms = step_ms
+        self.selected_ship = selected_ship
+        self.meteor_sizes = meteor_sizes
+        self.masks = masks
+        self.asteroid_field = asteroid_field
+        self.vectorized_collisions = vectorized_collisions
+        self.score = score  # Final score of the recorded game, to check the replay against
+
+    def __len__(self):
+        return len(self.masks)
+
+    def get_runs(self):
+        runs = []
+        for mask in self.masks:
+            if runs and runs[-1][0] == mask:
+                runs[-1][1] += 1
+            else:
+                runs.append([mask, 1])
+        return runs
+
+    def to_bytes(self):
+        flags = ((FLAG_ASTEROID_FIELD if self.asteroid_field else 0) |
+                 (FLAG_VECTORIZED_COLLISIONS if self.vectorized_collisions else 0))
+        header = struct.pack(HEADER_FORMAT, REPLAY_MAGIC, self.seed, self.start_ms, self.step_ms, self.score,
+                             len(self.masks), self.selected_ship, flags, len(self.meteor_sizes))
+        sizes = bytes(value for size in self.meteor_sizes for value in size)
+        return header + sizes + encode_runs(self.get_runs())
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, seed, start_ms, step_ms, score, steps, ship, flags, meteor_count = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("not a replay file")
+        offset = HEADER_SIZE
+        meteor_sizes = [(data[offset + 2 * i], data[offset + 2 * i + 1]) for i in range(meteor_count)]
+        masks = decode_masks(data, offset + 2 * meteor_count, steps)
+        return cls(seed, start_ms, step_ms, ship, meteor_sizes, masks,
+                   bool(flags & FLAG_ASTEROID_FIELD), bool(flags & FLAG_VECTORIZED_COLLISIONS), score)
+
+def load_replay(path):
+    with open(path, 'rb') as file:
+        return Replay.from_bytes(file.read())
+
+# -- Recording --
+class ReplayRecorder:
+    """Collects the input mask of every step; encoding and writing happen on a worker thread"""
+
+    def __init__(self, seed, start_ms, step_ms, selected_ship, meteor_sizes,
+                 asteroid_field=False, vectorized_collisions=False):
+        self.replay = Replay(seed, start_ms, step_ms, selected_ship, meteor_sizes, [],
+                             asteroid_field, vectorized_collisions)
+
+    def record(self, mask):
+        self.replay.masks.append(mask)
+
+    def save(self, score, folder=REPLAY_FOLDER):
+        """Write the replay to folder in the background; returns a future with the path"""
+        if not self.replay.masks:
+            return None
+        self.replay.score = score
+        path = os.path.join(folder, time.strftime("replay_%Y%m%d_%H%M%S.ssr"))
+        writer = ThreadPoolExecutor(max_workers=1)
+        future = writer.submit(write_replay, self.replay, path)
+        writer.shutdown(wait=False)  # The queued write still finishes, even at exit
+        return future
+
+def write_replay(replay, path, keep=MAX_REPLAYS):
+    """Write replay to path and delete the oldest replays beyond keep"""
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(replay.to_bytes())
+    replays = sorted(name for name in os.listdir(folder) if name.endswith('.ssr'))
+    for name in replays[:-keep]:
+        os.remove(os.path.join(folder, name))
+    return path
+
+# -- Playback --
+def run_replay(replay, screen=None, asteroid_field=None, vectorized_collisions=None):
+    """Simulate the replay headless, as fast as possible; returns headless.run's summary"""
+    import game
+    import headless
+
+    if asteroid_field is None:
+        asteroid_field = replay.asteroid_field
+    if vectorized_collisions is None:
+        vectorized_collisions = replay.vectorized_collisions
+    assets = game.load_assets(meteor_sizes=replay.meteor_sizes)
+    return headless.run(assets, len(replay), replay.seed, replay.selected_ship, ReplayInput(replay.masks), screen,
+                        asteroid_field=asteroid_field, vectorized_collisions=vectorized_collisions,
+                        start_ms=replay.start_ms, step_ms=replay.step_ms)
+
+def main():
+    import headless
+    from profiler import profiler
+
+    parser = argparse.ArgumentParser(description="Replay a recorded game headless")
+    parser.add_argument('path')
+    parser.add_argument('--render', action='store_true', help="also draw every frame")
+    parser.add_argument('--profile', metavar='PATH', help="dump per-frame phase timings (.csv or .jsonl)")
+    parser.add_argument('--field', action='store_true', help="force the NumPy AsteroidField on")
+    parser.add_argument('--kernels', action='store_true', help="force the NumPy collision kernels on")
+    args = parser.parse_args()
+
+    replay = load_replay(args.path)
+    if args.profile:
+        profiler.set_enabled(True)
+        profiler.start_dump(args.profile)
+
+    screen = headless.init_headless()
+    result = run_replay(replay, screen if args.render else None,
+                        True if args.field else None, True if args.kernels else None)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    print(f"recorded_score: {replay.score} ({'matches' if result['score'] == replay.score else 'DIFFERS'})")
+    if args.profile:
+        profiler.stop_dump()
+        print()
+        print("\n".join(profiler.get_overlay_lines()))
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import math
+import pygame
+
+# -- Constants --
+ROTATION_STEPS = 72  # Pre-baked angles per image (72 = every 5 degrees)
+ROTATION_MEMORY_BUDGET = 16 * 1024 * 1024  # Bytes of rotated frames kept in total
+MIN_ROTATION_STEPS = 8  # Below this the image is rotated live instead
+
+# -- Helpers --
+def get_tight_radius(mask):
+    """Distance from the mask centre to its farthest set pixel (corner included).
+
+    Walks the outline in Python, so it is meant for one mask per image,
+    not for every rotation step.
+    """
+    center_x, center_y = mask.get_size()[0] // 2, mask.get_size()[1] // 2
+    radius = 0
+    for component in mask.connected_components():
+        for x, y in component.outline():
+            # Farthest corner of the pixel, so the circle encloses it
+            dx = max(abs(x - center_x), abs(x + 1 - center_x))
+            dy = max(abs(y - center_y), abs(y + 1 - center_y))
+            radius = max(radius, dx * dx + dy * dy)
+    return int(math.ceil(math.sqrt(radius)))
+
+# -- Rotation Frame Cache --
+class RotationCache:
+    """Pre-rotated frames per source image, shared by every sprite using it.
+
+    Frames are built once per image the first time it is requested, so a
+    rotation becomes a table lookup instead of a pygame.transform.rotate
+    call. If the memory budget cannot hold at least MIN_ROTATION_STEPS
+    frames for an image, that image falls back to live rotation.
+    """
+
+    def __init__(self, steps=ROTATION_STEPS, memory_budget=ROTATION_MEMORY_BUDGET):
+        self.steps = steps
+        self.memory_budget = memory_budget
+        self.memory_used = 0
+        self.frames = {}  # source Surface -> list of rotated Surfaces (or None)
+        self.masks = {}  # source Surface -> list of collision Masks, one per rotation step
+        self.radii = {}  # source Surface -> tight radius, the same for every rotation step
+
+    def estimate_frame_bytes(self, image):
+        """Worst-case size of one rotated frame (bounding box at 45 degrees)"""
+        side = int(math.ceil((image.get_width() + image.get_height()) / math.sqrt(2)))
+        return side * side * image.get_bytesize()
+
+    def build(self, image):
+        """Bake rotated frames, masks and radii for an image within the remaining budget"""
+        steps = self.steps
+        if steps > 0:
+            remaining = self.memory_budget - self.memory_used
+            steps = min(steps, remaining // self.estimate_frame_bytes(image))
+
+        if steps < MIN_ROTATION_STEPS:
+            self.frames[image] = None  # Over budget, rotate live
+            # Masks are 1 bit per pixel, so they are baked at every step anyway
+            mask_steps = self.steps or ROTATION_STEPS
+            self.build_masks(image, [pygame.transform.rotate(image, i * 360 / mask_steps) for i in range(mask_steps)])
+            return None
+
+        step_angle = 360 / steps
+        frames = []
+        for i in range(steps):
+            frame = pygame.transform.rotate(image, i * step_angle)
+            self.memory_used += frame.get_width() * frame.get_height() * frame.get_bytesize()
+            frames.append(frame)
+        self.frames[image] = frames
+        self.build_masks(image, frames)
+        return frames
+
+    def build_masks(self, image, frames):
+        """Collision mask of every rotated frame, and one tight radius for the image.
+
+        Rotating about the centre keeps every pixel's distance to it, so
+        the unrotated radius plus 1 px (the rotated frame's centre can
+        round a pixel off) covers every step.
+        """
+        self.masks[image] = [pygame.mask.from_surface(frame) for frame in frames]
+        self.radii[image] = get_tight_radius(pygame.mask.from_surface(image)) + 1
+
+    def prebuild(self, images):
+        """Bake frames for a list of images up front (avoids first-use hitches)"""
+        for image in images:
+            if image not in self.frames:
+                self.build(image)
+
+    def get_frame(self, image, angle):
+        """Return image rotated to the nearest baked angle.
+
+        Images over budget are rotated live, to the nearest mask step so
+        the frame drawn is exactly the one its mask was built from.
+        """
+        if image in self.frames:
+            frames = self.frames[image]
+        else:
+            frames = self.build(image)
+
+        if frames is None:
+            steps = len(self.masks[image])
+            index = int(round(angle * steps / 360)) % steps
+            return pygame.transform.rotate(image, index * 360 / steps)
+        index = int(round(angle * len(frames) / 360)) % len(frames)
+        return frames[index]
+
+    def get_mask(self, image, angle):
+        """Return (mask, radius) of image at the nearest baked angle"""
+        if image not in self.masks:
+            self.build(image)
+        masks = self.masks[image]
+        index = int(round(angle * len(masks) / 360)) % len(masks)
+        return masks[index], self.radii[image]
+
+    def clear(self):
+        """Drop all baked frames and masks"""
+        self.frames.clear()
+        self.masks.clear()
+        self.radii.clear()
+        self.memory_used = 0
+
+    def get_stats(self):
+        """Get cache size information"""
+        return {
+            'images': len(self.frames),
+            'baked_images': sum(1 for frames in self.frames.values() if frames),
+            'frames': sum(len(frames) for frames in self.frames.values() if frames),
+            'masks': sum(len(masks) for masks in self.masks.values()),
+            'memory_used': self.memory_used,
+            'memory_budget': self.memory_budget
+        }
+
+# Shared instance used by all asteroids
+rotation_cache = RotationCache()
@@ -0,0 +1,21 @@
+import os
+import sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import random
+import pytest
+
+# The game is a flat set of modules loading assets by relative path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import game
+import headless
+
+@pytest.fixture(scope='session')
+def assets():
+    """Game assets loaded once behind a hidden display"""
+    headless.init_headless()
+    return game.load_assets(random.Random(0))
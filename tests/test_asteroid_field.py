@@ -0,0 +1,15 @@
+import pytest
+import asteroid_field
+import headless
+
+pytestmark = pytest.mark.skipif(not asteroid_field.is_available(), reason="AsteroidField needs NumPy")
+
+@pytest.mark.parametrize('seed', range(4))
+def test_field_matches_blocks(assets, seed):
+    assert asteroid_field.check_parity(assets['meteor_images'], seed=seed) is None
+
+@pytest.mark.parametrize('seed', range(8))
+def test_headless_run_matches_with_field(assets, seed):
+    blocks = headless.run(assets, 3600, seed)
+    field = headless.run(assets, 3600, seed, asteroid_field=True)
+    assert (field['frames'], field['score'], field['state']) == (blocks['frames'], blocks['score'], blocks['state'])
@@ -0,0 +1,74 @@
+import pygame
+from collections import OrderedDict
+
+# -- Constants --
+DEFAULT_MAX_ENTRIES = 256  # Rendered surfaces kept before the oldest is evicted
+
+# -- Text Render Cache --
+class TextCache:
+    """Shared font pool plus LRU cache of rendered text surfaces.
+
+    Fonts are created once per size, and rendered surfaces are keyed by
+    (text, size, color) so static labels are rendered only once. Changing
+    strings (e.g. a new score value) miss the cache and push the least
+    recently used entry out once max_entries is reached.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.fonts = {}  # size -> pygame.font.Font
+        self.surfaces = OrderedDict()  # (text, size, color) -> Surface
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_font(self, size):
+        """Return the pooled font for the given size"""
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        """Return a rendered surface for text, reusing a cached one if possible"""
+        key = (text, size, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.get_font(size).render(text, True, color)
+        self.surfaces[key] = surface
+        while len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        """Drop all cached surfaces and fonts (e.g. after pygame.quit)"""
+        self.surfaces.clear()
+        self.fonts.clear()
+
+    def get_stats(self):
+        """Get cache counters for debugging and profiling"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.surfaces),
+            'fonts': len(self.fonts),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+# Shared instance used by every screen
+text_cache = TextCache()
+
+def render_text(text, size, color=(255, 255, 255)):
+    """Render text through the shared cache"""
+    return text_cache.render(text, size, color)